@@ -0,0 +1,169 @@
+import math
+from datetime import date, datetime, timedelta
+
+import day_keys
+
+def ensure_tables(cursor):
+    """Create the prediction log and the running accuracy accumulators if missing.
+
+    Run once per database, by db_setup and app.ensure_schema; the
+    functions below assume the tables exist.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Predictions (
+            ProductID INTEGER NOT NULL,
+            TargetDate DATE NOT NULL,
+            Horizon INTEGER NOT NULL,
+            Predicted INTEGER NOT NULL,
+            Actual INTEGER,
+            PRIMARY KEY (ProductID, TargetDate, Horizon)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AccuracyStats (
+            ProductID INTEGER NOT NULL,
+            Horizon INTEGER NOT NULL,
+            Count INTEGER NOT NULL DEFAULT 0,
+            SumAbsError REAL NOT NULL DEFAULT 0,
+            SumSquaredError REAL NOT NULL DEFAULT 0,
+            SumError REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (ProductID, Horizon)
+        ) WITHOUT ROWID
+    ''')
+
+def _score(cursor, product_id, horizon, predicted, old_actual, new_actual):
+    """Replace one prediction's contribution to the accumulators (old_actual None = not yet scored)"""
+    count = 0 if old_actual is not None else 1
+    abs_error = abs(predicted - new_actual)
+    squared_error = (predicted - new_actual) ** 2
+    error = predicted - new_actual
+    if old_actual is not None:
+        abs_error -= abs(predicted - old_actual)
+        squared_error -= (predicted - old_actual) ** 2
+        error -= predicted - old_actual
+
+    cursor.execute('''
+        INSERT INTO AccuracyStats (ProductID, Horizon, Count, SumAbsError, SumSquaredError, SumError)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ProductID, Horizon) DO UPDATE SET
+            Count = Count + excluded.Count,
+            SumAbsError = SumAbsError + excluded.SumAbsError,
+            SumSquaredError = SumSquaredError + excluded.SumSquaredError,
+            SumError = SumError + excluded.SumError
+    ''', (product_id, horizon, count, abs_error, squared_error, error))
+
+def log_forecast(cursor, product_id, predictions, first_date, today=None):
+    """Store a served forecast; the first forecast issued for a product/date/horizon is kept.
+
+    Target dates before today are skipped since their sales are already in.
+    Any sales already recorded for a target date (e.g. earlier today) are
+    scored straight away through the (ProductID, SaleDay) index.
+    """
+    today = (today or date.today()).isoformat()
+    first_date = datetime.fromisoformat(str(first_date)[:10]).date()
+
+    logged = 0
+    for horizon, predicted in enumerate(predictions, start=1):
+        target_date = (first_date + timedelta(days=horizon - 1)).isoformat()
+        if target_date < today:
+            continue
+        cursor.execute('''
+            INSERT INTO Predictions (ProductID, TargetDate, Horizon, Predicted)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(ProductID, TargetDate, Horizon) DO NOTHING
+        ''', (product_id, target_date, horizon, int(predicted)))
+        if cursor.rowcount == 0:
+            continue
+        logged += 1
+
+        cursor.execute(
+            'SELECT SUM(QuantitySold) FROM Sales WHERE ProductID = ? AND SaleDay = ?',
+            (product_id, day_keys.to_day(target_date))
+        )
+        actual = cursor.fetchone()[0]
+        if actual is not None:
+            cursor.execute(
+                'UPDATE Predictions SET Actual = ? WHERE ProductID = ? AND TargetDate = ? AND Horizon = ?',
+                (actual, product_id, target_date, horizon)
+            )
+            _score(cursor, product_id, horizon, int(predicted), None, actual)
+    return logged
+
+def record_actual(cursor, product_id, sale_date, quantity):
+    """Add quantity (negative for a deleted sale) to the actuals of forecasts for that day"""
+    target_date = str(sale_date)[:10]
+    cursor.execute(
+        'SELECT Horizon, Predicted, Actual FROM Predictions WHERE ProductID = ? AND TargetDate = ?',
+        (product_id, target_date)
+    )
+    for horizon, predicted, old_actual in cursor.fetchall():
+        new_actual = (old_actual or 0) + quantity
+        cursor.execute(
+            'UPDATE Predictions SET Actual = ? WHERE ProductID = ? AND TargetDate = ? AND Horizon = ?',
+            (new_actual, product_id, target_date, horizon)
+        )
+        _score(cursor, product_id, horizon, predicted, old_actual, new_actual)
+
+def score_past_days(cursor, today=None):
+    """Score predictions for days before today that no sale has scored, with that day's sales (0 if none).
+
+    The model is trained on a dense daily series where days without sales
+    are real zeros, so those days count toward MAE and bias as well.
+    """
+    today = (today or date.today()).isoformat()
+    cursor.execute(
+        'SELECT ProductID, TargetDate, Horizon, Predicted FROM Predictions WHERE Actual IS NULL AND TargetDate < ?',
+        (today,)
+    )
+    scored = 0
+    for product_id, target_date, horizon, predicted in cursor.fetchall():
+        actual = cursor.execute(
+            'SELECT COALESCE(SUM(QuantitySold), 0) FROM Sales WHERE ProductID = ? AND SaleDay = ?',
+            (product_id, day_keys.to_day(target_date))
+        ).fetchone()[0]
+        cursor.execute(
+            'UPDATE Predictions SET Actual = ? WHERE ProductID = ? AND TargetDate = ? AND Horizon = ? AND Actual IS NULL',
+            (actual, product_id, target_date, horizon)
+        )
+        # Another worker may have scored it since the SELECT
+        if cursor.rowcount:
+            _score(cursor, product_id, horizon, predicted, None, actual)
+            scored += 1
+    return scored
+
+def _summary(count, sum_abs, sum_squared, sum_error):
+    if not count:
+        return {'count': 0, 'mae': None, 'rmse': None, 'bias': None}
+    return {
+        'count': count,
+        'mae': round(sum_abs / count, 4),
+        'rmse': round(math.sqrt(max(sum_squared, 0) / count), 4),
+        'bias': round(sum_error / count, 4)
+    }
+
+def model_health(conn, product_id=None):
+    """MAE, RMSE and bias (predicted - actual) overall, by horizon and by product.
+
+    Reads only the AccuracyStats accumulators (one row per product and horizon).
+    """
+    cursor = conn.cursor()
+    where, params = ('WHERE ProductID = ?', (product_id,)) if product_id is not None else ('', ())
+
+    def grouped(column, key):
+        query = f'''
+            SELECT {column}, SUM(Count), SUM(SumAbsError), SUM(SumSquaredError), SUM(SumError)
+            FROM AccuracyStats {where}
+            GROUP BY {column} ORDER BY {column}
+        '''
+        return [{key: row[0], **_summary(*row[1:])} for row in cursor.execute(query, params)]
+
+    overall = cursor.execute(f'''
+        SELECT SUM(Count), SUM(SumAbsError), SUM(SumSquaredError), SUM(SumError)
+        FROM AccuracyStats {where}
+    ''', params).fetchone()
+
+    return {
+        'overall': _summary(*overall),
+        'by_horizon': grouped('Horizon', 'horizon'),
+        'by_product': grouped('ProductID', 'product_id')
+    }
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import Future
+
+class Overloaded(Exception):
+    """Raised when a ConcurrencyLimit has no free slot"""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Server busy, retry later')
+        self.retry_after = retry_after
+
+class SingleFlight:
+    """Coalesce identical in-flight calls so one computation serves every waiter.
+
+    The first caller for a key runs fn; callers arriving while it runs wait
+    for the same result (or exception). Nothing is cached once it finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args):
+        """Return (result, shared); shared is True when another caller computed it"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if leader:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result(), not leader
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._calls)}
+
+class ConcurrencyLimit:
+    """Bound how many expensive calls run at once; extra callers are rejected, not queued.
+
+    Callers wait at most max_wait_ms for a slot, then get Overloaded so the
+    request can be answered with 429 instead of tying up a server thread.
+    """
+
+    def __init__(self, limit, max_wait_ms=0, retry_after=1):
+        self.limit = limit
+        self.max_wait = max_wait_ms / 1000.0
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+        self._lock = threading.Lock()
+        self._stats = {'admitted': 0, 'rejected': 0, 'active': 0}
+
+    def run(self, fn, *args):
+        if self._slots is None:
+            return fn(*args)
+        if self.max_wait:
+            acquired = self._slots.acquire(timeout=self.max_wait)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise Overloaded(self.retry_after)
+
+        with self._lock:
+            self._stats['admitted'] += 1
+            self._stats['active'] += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._stats['active'] -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'limit': self.limit}
@@ -1,10 +1,47 @@
-from flask import Flask, render_template, jsonify, request
+import time
+_module_start = time.perf_counter()
+
+from flask import Flask, Response, render_template, jsonify, request, has_request_context
 import sqlite3
 import pickle
-import pandas as pd
-import numpy as np
+import importlib
 from datetime import datetime, timedelta
 import os
+import threading
+from write_queue import WriteQueue
+from admission import SingleFlight, ConcurrencyLimit, Overloaded
+import stores
+import sales_archive
+import accuracy_monitor
+import sales_export
+import product_search
+import day_keys
+
+class LazyModule:
+    """Module proxy that imports on first attribute access.
+
+    pandas, numpy (and scikit-learn, via unpickling) are only needed by the
+    forecast path, so CRUD endpoints can serve before they are imported.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+sales_snapshot = LazyModule('sales_snapshot')
+demand_matrix = LazyModule('demand_matrix')
+sql_features = LazyModule('sql_features')
+stockout_sim = LazyModule('stockout_sim')
+inference_batcher = LazyModule('inference_batcher')
+model_partitions = LazyModule('model_partitions')
+forecasting = LazyModule('forecasting')
 
 app = Flask(__name__,
             template_folder='../templates',
@@ -20,37 +57,171 @@ def load_model(filename='inventory_model.pkl'):
     except FileNotFoundError:
         return None
 
-def load_sales_data():
-    """Load sales data from database"""
-    conn = sqlite3.connect('inventory.db')
+MODEL_PATH = 'inventory_model.pkl'
+# Serve the per-category models in MODEL_PARTITIONS_DIR instead of MODEL_PATH
+PARTITIONED_MODEL = os.environ.get('PARTITIONED_MODEL', '0') == '1'
+_model_cache = {'model': None, 'mtime': None}
+
+def get_model():
+    """Return the process-wide model, reloading it when the file (or partition index) changes on disk"""
+    path = model_partitions.index_path() if PARTITIONED_MODEL else MODEL_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _model_cache['model']
+    
+    if mtime != _model_cache['mtime']:
+        model = model_partitions.load(model_partitions.PARTITIONS_DIR) if PARTITIONED_MODEL else load_model(MODEL_PATH)
+        if model is not None:
+            _model_cache['model'] = model
+            _model_cache['mtime'] = mtime
+    return _model_cache['model']
+
+STARTUP_MODE = os.environ.get('STARTUP_MODE', 'eager')
+_startup = {'warm': False, 'timings': {}}
+
+def warm_up():
+    """Import the forecast stack, load the model and run one dummy prediction.
+    
+    /api/ready reports healthy only after this has completed, so the first real
+    forecast never pays for imports or unpickling.
+    """
+    timings = {}
+    
+    start_time = time.perf_counter()
+    importlib.import_module('numpy')
+    importlib.import_module('pandas')
+    timings['import_pandas_numpy'] = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    model = get_model()
+    timings['load_model'] = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    if get_sales_snapshot() is None and FEATURE_BACKEND == 'matrix':
+        get_demand_matrix()
+    timings['load_sales_history'] = time.perf_counter() - start_time
+    
+    if model is not None:
+        start_time = time.perf_counter()
+        forecast_from_history(model, 0, [0] * 30, datetime.now().date(), days_ahead=1)
+        timings['dummy_predict'] = time.perf_counter() - start_time
+    
+    _startup['timings'].update(timings)
+    _startup['warm'] = model is not None
+    
+    breakdown = ', '.join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in _startup['timings'].items())
+    status = "ready" if _startup['warm'] else "no model found"
+    print(f"[{os.getpid()}] Startup ({status}): {breakdown}")
+    return _startup['warm']
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+def ensure_schema(db_path):
+    """Migrate a database to day keys and create the accuracy-monitor tables the first time this process uses it"""
+    if db_path in _migrated:
+        return db_path
+    with _migrate_lock:
+        if db_path not in _migrated and os.path.exists(db_path):
+            conn = sqlite3.connect(db_path)
+            try:
+                if day_keys.ensure_day_keys(conn):
+                    print(f"[{os.getpid()}] Migrated {db_path} to integer day keys")
+                accuracy_monitor.ensure_tables(conn.cursor())
+                conn.commit()
+            finally:
+                conn.close()
+            _migrated.add(db_path)
+    return db_path
+
+def migrate_databases():
+    """Bring inventory.db and every store shard up to date before serving"""
+    for store_id in stores.all_store_ids():
+        ensure_schema(stores.db_path(store_id))
+
+def preload():
+    """Warm up the model and read-only reference data before workers fork"""
+    migrate_databases()
+    return warm_up()
+
+def start_warm_up():
+    """Run warm_up in eager (blocking) or lazy (background thread) startup mode"""
+    migrate_databases()
+    if STARTUP_MODE == 'lazy':
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+    else:
+        warm_up()
+
+def load_sales_data(include_archive=False, db_path=None):
+    """Load sales data from database (hot table only unless include_archive)"""
+    db_path = db_path or get_db_path()
+    conn = sqlite3.connect(db_path)
+    source = sales_archive.sales_source(conn, db_path, include_archive)
     query = '''
         SELECT 
             s.SaleID,
             s.ProductID,
-            s.SaleDate,
+            s.SaleDay,
             s.QuantitySold,
             s.TotalAmount,
             p.ProductName,
             p.Category,
             p.UnitPrice
-        FROM Sales s
+        FROM {source} AS s
         JOIN Products p ON s.ProductID = p.ProductID
-        ORDER BY s.SaleDate
+        ORDER BY s.SaleDay
     '''
-    df = pd.read_sql_query(query, conn)
+    df = pd.read_sql_query(query.format(source=source), conn)
     conn.close()
-    df['SaleDate'] = pd.to_datetime(df['SaleDate'])
+    df.insert(2, 'SaleDate', pd.to_datetime(df.pop('SaleDay'), unit='D'))
+    return df
+
+SALES_SERIES_DTYPES = {'ProductID': 'int32', 'QuantitySold': 'int32'}
+
+def load_sales_series(db_path=None):
+    """Load only the columns the feature path needs, downcast to 32-bit"""
+    conn = sqlite3.connect(db_path or get_db_path())
+    query = '''
+        SELECT ProductID, SaleDay, QuantitySold
+        FROM Sales
+        ORDER BY SaleDay
+    '''
+    df = pd.read_sql_query(query, conn, dtype=SALES_SERIES_DTYPES)
+    conn.close()
+    df.insert(1, 'SaleDate', pd.to_datetime(df.pop('SaleDay'), unit='D'))
+    return df
+
+def load_product_dimension(db_path=None):
+    """Load product attributes once per product instead of once per sale"""
+    conn = sqlite3.connect(db_path or get_db_path())
+    df = pd.read_sql_query(
+        'SELECT ProductID, ProductName, Category, UnitPrice FROM Products',
+        conn,
+        index_col='ProductID'
+    )
+    conn.close()
+    df['ProductName'] = df['ProductName'].astype('category')
+    df['Category'] = df['Category'].astype('category')
+    df['UnitPrice'] = df['UnitPrice'].astype('float32')
+    return df
+
+def downcast_features(df):
+    """Shrink engineered feature columns to the narrowest dtype that holds them"""
+    for col in ['DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter']:
+        df[col] = df[col].astype('int8')
+    for col in ['Sales_Lag_7', 'Sales_Lag_14', 'Sales_Lag_30', 'Sales_Rolling_7', 'Sales_Rolling_30']:
+        df[col] = df[col].astype('float32')
     return df
 
-def create_features(df):
+def create_features(df, copy=True):
     """Create ML features from sales data"""
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
-    df['DayOfWeek'] = df['SaleDate'].dt.dayofweek
-    df['Month'] = df['SaleDate'].dt.month
-    df['WeekOfYear'] = df['SaleDate'].dt.isocalendar().week
-    df['DayOfMonth'] = df['SaleDate'].dt.day
-    df['Quarter'] = df['SaleDate'].dt.quarter
+    days = (df['SaleDate'] - pd.Timestamp(day_keys.EPOCH)).dt.days.to_numpy()
+    for name, values in day_keys.calendar_columns(days).items():
+        df[name] = values
     
     product_dfs = []
     for product_id in df['ProductID'].unique():
@@ -70,64 +241,205 @@ def create_features(df):
     df_with_features = df_with_features.bfill().fillna(0)
     return df_with_features
 
-def predict_future_demand(model, product_id, days_ahead=7, df_with_features=None):
-    """Predict future demand for a product"""
+INFERENCE_BATCH_ENABLED = os.environ.get('INFERENCE_BATCH', '0') == '1'
+INFERENCE_BATCH_MAX = int(os.environ.get('INFERENCE_BATCH_MAX', 64))
+INFERENCE_BATCH_WAIT_MS = float(os.environ.get('INFERENCE_BATCH_WAIT_MS', 2))
+_inference_batcher = {'batcher': None, 'pid': None}
+_inference_batcher_lock = threading.Lock()
+
+def get_inference_batcher():
+    """This process's inference batcher, or None when batching is off"""
+    if not INFERENCE_BATCH_ENABLED:
+        return None
+    with _inference_batcher_lock:
+        if _inference_batcher['pid'] != os.getpid():
+            _inference_batcher['batcher'] = inference_batcher.InferenceBatcher(
+                demand_matrix.FEATURE_COLUMNS, INFERENCE_BATCH_MAX, INFERENCE_BATCH_WAIT_MS
+            )
+            _inference_batcher['pid'] = os.getpid()
+        return _inference_batcher['batcher']
+
+def predict_rows(model, rows):
+    """model.predict on feature rows, merged with concurrent callers' rows when batching is on"""
+    batcher = get_inference_batcher()
+    if batcher is not None:
+        return batcher.predict(model, rows)
+    return forecasting.predict_rows(model, rows)
+
+def forecast_batch(model, product_ids, histories, last_dates, days_ahead=7):
+    """Roll several products forward together, with one predict_rows call per day"""
+    return forecasting.forecast_batch(model, product_ids, histories, last_dates, days_ahead, predict=predict_rows)
+
+def forecast_from_history(model, product_id, recent_sales, last_date, days_ahead=7):
+    """Roll the model forward from a product's recent daily quantities"""
+    return forecast_batch(model, [product_id], [recent_sales], [last_date], days_ahead)[0]
+
+def history_from_features(df_with_features, product_id, window=30):
+    """Recent quantities and last sale date of a product from a feature frame"""
+    product_data = df_with_features[df_with_features['ProductID'] == product_id]
+    product_data = product_data.sort_values(by='SaleDate')
+    
+    if len(product_data) == 0:
+        return [], None
+    
+    return product_data['QuantitySold'].tail(window).tolist(), product_data.iloc[-1]['SaleDate']
+
+def load_recent_history(product_id, window=30):
+    """Recent quantities and last sale date from the configured feature backend"""
+    snapshot = get_sales_snapshot() if get_db_path() == stores.DEFAULT_DB else None
+    if snapshot is not None:
+        return snapshot.recent_history(product_id, window)
+    
+    if FEATURE_BACKEND == 'sql':
+        conn = sqlite3.connect(get_db_path())
+        try:
+            return sql_features.recent_history(conn, product_id, window)
+        finally:
+            conn.close()
+    
+    return get_demand_matrix().recent_history(product_id, window)
+
+def forecast_demand(model, product_id, days_ahead=7, df_with_features=None):
+    """Predictions plus the date of the first predicted day (None without history)"""
     if model is None:
-        return []
+        return [], None
     
     if df_with_features is None:
-        df = load_sales_data()
-        df_with_features = create_features(df)
+        recent_sales, last_date = load_recent_history(product_id)
+    else:
+        recent_sales, last_date = history_from_features(df_with_features, product_id)
     
-    product_data = df_with_features[df_with_features['ProductID'] == product_id].copy()
-    product_data = product_data.sort_values(by='SaleDate')
+    if not recent_sales:
+        return [], None
     
-    if len(product_data) == 0:
-        return []
-    
-    last_row = product_data.iloc[-1]
-    predictions = []
-    
-    feature_columns = [
-        'ProductID', 'DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter',
-        'Sales_Lag_7', 'Sales_Lag_14', 'Sales_Lag_30',
-        'Sales_Rolling_7', 'Sales_Rolling_30'
-    ]
-    
-    recent_sales = product_data['QuantitySold'].tail(30).tolist()
-    last_date = last_row['SaleDate']
-    
-    for day in range(1, days_ahead + 1):
-        future_date = last_date + timedelta(days=day)
-        
-        features = {
-            'ProductID': product_id,
-            'DayOfWeek': future_date.dayofweek,
-            'Month': future_date.month,
-            'WeekOfYear': future_date.isocalendar()[1],
-            'DayOfMonth': future_date.day,
-            'Quarter': (future_date.month - 1) // 3 + 1,
-            'Sales_Lag_7': recent_sales[-7] if len(recent_sales) >= 7 else recent_sales[-1],
-            'Sales_Lag_14': recent_sales[-14] if len(recent_sales) >= 14 else recent_sales[-1],
-            'Sales_Lag_30': recent_sales[-30] if len(recent_sales) >= 30 else recent_sales[-1],
-            'Sales_Rolling_7': np.mean(recent_sales[-7:]) if len(recent_sales) >= 7 else np.mean(recent_sales),
-            'Sales_Rolling_30': np.mean(recent_sales[-30:]) if len(recent_sales) >= 30 else np.mean(recent_sales)
-        }
-        
-        X_future = pd.DataFrame([[features[col] for col in feature_columns]], columns=feature_columns)
-        prediction = model.predict(X_future)[0]
-        prediction = max(0, int(round(prediction)))
-        
-        predictions.append(prediction)
-        recent_sales.append(prediction)
+    first_date = pd.Timestamp(last_date).date() + timedelta(days=1)
+    return forecast_from_history(model, product_id, recent_sales, last_date, days_ahead), first_date
+
+def predict_future_demand(model, product_id, days_ahead=7, df_with_features=None):
+    """Predict future demand for a product"""
+    return forecast_demand(model, product_id, days_ahead, df_with_features)[0]
+
+FEATURE_BACKEND = os.environ.get('FEATURE_BACKEND', 'matrix')
+if FEATURE_BACKEND not in ('matrix', 'sql'):
+    # Both backends build day-based features like training does; anything else is a typo
+    raise ValueError(f"FEATURE_BACKEND must be 'matrix' or 'sql', not {FEATURE_BACKEND!r}")
+MONITOR_PREDICTIONS = os.environ.get('MONITOR_PREDICTIONS', '1') == '1'
+MATRIX_REBUILD_SECONDS = int(os.environ.get('MATRIX_REBUILD_SECONDS', 300))
+_demand_matrices = {}
+_demand_matrix_lock = threading.Lock()
+
+def _rebuild_demand_matrix(conn, state):
+    last_sale_id = conn.execute('SELECT COALESCE(MAX(SaleID), 0) FROM Sales').fetchone()[0]
+    matrix = demand_matrix.DemandMatrix.from_db(conn, 'WHERE SaleID <= ?', (last_sale_id,))
+    state.update(matrix=matrix, last_sale_id=last_sale_id, built_at=time.monotonic())
+    return matrix
+
+def _apply_new_sales(conn, state):
+    """Add sales recorded since the last refresh; False if a rebuild is needed"""
+    new_sales = conn.execute(
+        'SELECT SaleID, ProductID, SaleDay, QuantitySold FROM Sales WHERE SaleID > ? ORDER BY SaleID',
+        (state['last_sale_id'],)
+    ).fetchall()
+    for sale_id, product_id, sale_day, quantity in new_sales:
+        try:
+            state['matrix'].add(product_id, day_keys.from_day(sale_day), quantity)
+        except ValueError:
+            return False
+        state['last_sale_id'] = sale_id
+    return True
+
+def get_demand_matrix():
+    """Return the process-wide demand matrix for the current store's database.
     
-    return predictions
+    New sales are added in place by SaleID; the matrix is rebuilt from scratch
+    every MATRIX_REBUILD_SECONDS (or after invalidate_demand_matrix) to pick up
+    deletions made by other workers.
+    """
+    db_path = get_db_path()
+    with _demand_matrix_lock:
+        state = _demand_matrices.setdefault(db_path, {'matrix': None, 'last_sale_id': 0, 'built_at': 0.0})
+        conn = sqlite3.connect(db_path)
+        try:
+            fresh = time.monotonic() - state['built_at'] <= MATRIX_REBUILD_SECONDS
+            if state['matrix'] is not None and fresh and _apply_new_sales(conn, state):
+                return state['matrix']
+            return _rebuild_demand_matrix(conn, state)
+        finally:
+            conn.close()
+
+def invalidate_demand_matrix():
+    with _demand_matrix_lock:
+        _demand_matrices.pop(get_db_path(), None)
+
+SNAPSHOT_PATH = os.environ.get('SALES_SNAPSHOT', 'sales_snapshot.bin')
+_sales_snapshot = None
+
+def get_sales_snapshot():
+    """Map the shared sales snapshot read-only, if one has been exported"""
+    global _sales_snapshot
+    if _sales_snapshot is None and os.path.exists(SNAPSHOT_PATH):
+        _sales_snapshot = sales_snapshot.SalesSnapshot(SNAPSHOT_PATH)
+    return _sales_snapshot
+
+CROSS_STORE_ENDPOINTS = {'get_dashboard_stats', 'get_restock_alerts'}
+
+def request_store_id():
+    """store_id from the query string, JSON body or X-Store-ID header (None = inventory.db)"""
+    store_id = request.args.get('store_id') or request.headers.get('X-Store-ID')
+    if store_id is None and request.is_json:
+        store_id = (request.get_json(silent=True) or {}).get('store_id')
+    return str(store_id) if store_id not in (None, '') else None
+
+def get_db_path():
+    """Database file for the store of the current request"""
+    if not has_request_context():
+        return ensure_schema(stores.DEFAULT_DB)
+    store_id = request_store_id()
+    if store_id == stores.ALL_STORES:
+        raise ValueError('store_id=all is only supported for cross-store views')
+    return ensure_schema(stores.db_path(store_id))
+
+@app.before_request
+def validate_store():
+    store_id = request_store_id()
+    if store_id is None:
+        return None
+    if store_id == stores.ALL_STORES:
+        if request.endpoint not in CROSS_STORE_ENDPOINTS:
+            return jsonify({'success': False, 'error': 'store_id=all is only supported for cross-store views'}), 400
+        migrate_databases()
+        return None
+    try:
+        if not stores.store_exists(store_id):
+            return jsonify({'success': False, 'error': f'Unknown store: {store_id}'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return None
 
 def get_db_connection():
-    conn = sqlite3.connect('inventory.db')
+    conn = sqlite3.connect(get_db_path())
     conn.row_factory = sqlite3.Row
     return conn
 
+WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE', '0') == '1'
+WRITE_QUEUE_MAX_BATCH = int(os.environ.get('WRITE_QUEUE_MAX_BATCH', 100))
+WRITE_QUEUE_MAX_WAIT_MS = float(os.environ.get('WRITE_QUEUE_MAX_WAIT_MS', 5))
+_write_queues = {'queues': {}, 'pid': None}
+_write_queue_lock = threading.Lock()
+
+def get_write_queue():
+    """Return this process's writer queue for the current store (started lazily, so it survives fork)"""
+    if not WRITE_QUEUE_ENABLED:
+        return None
+    db_path = get_db_path()
+    with _write_queue_lock:
+        if _write_queues['pid'] != os.getpid():
+            _write_queues['queues'] = {}
+            _write_queues['pid'] = os.getpid()
+        if db_path not in _write_queues['queues']:
+            _write_queues['queues'][db_path] = WriteQueue(db_path, WRITE_QUEUE_MAX_BATCH, WRITE_QUEUE_MAX_WAIT_MS)
+        return _write_queues['queues'][db_path]
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -175,49 +487,109 @@ def get_products():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/restock-alerts', methods=['GET'])
-def get_restock_alerts():
+_search_indexed = set()
+
+def ensure_search_index(conn):
+    """Build the FTS5 product index for this store the first time this process needs it"""
+    db_path = get_db_path()
+    if db_path not in _search_indexed:
+        product_search.ensure_index(conn)
+        _search_indexed.add(db_path)
+
+@app.route('/api/products/search', methods=['GET'])
+def search_products():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        query = request.args.get('q', '').strip()
+        limit = request.args.get('limit', product_search.DEFAULT_LIMIT, type=int)
         
-        cursor.execute('''
-            SELECT 
-                p.ProductID,
-                p.ProductName,
-                p.Category,
-                i.QuantityAvailable,
-                i.ReorderPoint,
-                i.MinimumStockLevel,
-                s.SupplierName,
-                s.Email as SupplierEmail
-            FROM Products p
-            JOIN Inventory i ON p.ProductID = i.ProductID
-            JOIN Suppliers s ON p.SupplierID = s.SupplierID
-            WHERE i.QuantityAvailable <= i.ReorderPoint
-            ORDER BY (i.QuantityAvailable - i.ReorderPoint) ASC
-        ''')
+        if not query:
+            return jsonify({'success': True, 'products': []})
         
-        alerts = []
-        for row in cursor.fetchall():
-            alerts.append({
-                'product_id': row['ProductID'],
-                'product_name': row['ProductName'],
-                'category': row['Category'],
-                'quantity_available': row['QuantityAvailable'],
-                'reorder_point': row['ReorderPoint'],
-                'minimum_stock_level': row['MinimumStockLevel'],
-                'supplier_name': row['SupplierName'],
-                'supplier_email': row['SupplierEmail'],
-                'deficit': row['ReorderPoint'] - row['QuantityAvailable']
-            })
+        conn = get_db_connection()
+        ensure_search_index(conn)
+        products = product_search.search_products(conn, query, limit)
+        conn.close()
+        return jsonify({'success': True, 'products': products})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def fetch_restock_alerts(conn):
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT 
+            p.ProductID,
+            p.ProductName,
+            p.Category,
+            i.QuantityAvailable,
+            i.ReorderPoint,
+            i.MinimumStockLevel,
+            s.SupplierName,
+            s.Email as SupplierEmail
+        FROM Products p
+        JOIN Inventory i ON p.ProductID = i.ProductID
+        JOIN Suppliers s ON p.SupplierID = s.SupplierID
+        WHERE i.QuantityAvailable <= i.ReorderPoint
+        ORDER BY (i.QuantityAvailable - i.ReorderPoint) ASC
+    ''')
+    
+    alerts = []
+    for row in cursor.fetchall():
+        alerts.append({
+            'product_id': row['ProductID'],
+            'product_name': row['ProductName'],
+            'category': row['Category'],
+            'quantity_available': row['QuantityAvailable'],
+            'reorder_point': row['ReorderPoint'],
+            'minimum_stock_level': row['MinimumStockLevel'],
+            'supplier_name': row['SupplierName'],
+            'supplier_email': row['SupplierEmail'],
+            'deficit': row['ReorderPoint'] - row['QuantityAvailable']
+        })
+    return alerts
+
+@app.route('/api/restock-alerts', methods=['GET'])
+def get_restock_alerts():
+    try:
+        if request_store_id() == stores.ALL_STORES:
+            alerts = []
+            for store_id, store_alerts in stores.fan_out(fetch_restock_alerts):
+                for alert in store_alerts:
+                    alert['store_id'] = store_id
+                    alerts.append(alert)
+            alerts.sort(key=lambda alert: alert['deficit'], reverse=True)
+            return jsonify({'success': True, 'alerts': alerts})
         
+        conn = get_db_connection()
+        alerts = fetch_restock_alerts(conn)
         conn.close()
         return jsonify({'success': True, 'alerts': alerts})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+FORECAST_MAX_CONCURRENCY = int(os.environ.get('FORECAST_MAX_CONCURRENCY', 8))
+FORECAST_MAX_WAIT_MS = float(os.environ.get('FORECAST_MAX_WAIT_MS', 0))
+FORECAST_RETRY_AFTER = int(os.environ.get('FORECAST_RETRY_AFTER', 1))
+forecast_flights = SingleFlight()
+forecast_limit = ConcurrencyLimit(FORECAST_MAX_CONCURRENCY, FORECAST_MAX_WAIT_MS, FORECAST_RETRY_AFTER)
+
+def run_forecast(model, product_id, days_ahead):
+    """Forecast a product and log it for the accuracy monitor; shared by coalesced requests"""
+    predictions, first_date = forecast_demand(model, product_id, days_ahead)
+    if predictions and MONITOR_PREDICTIONS:
+        try:
+            apply_write(accuracy_monitor.log_forecast, product_id, predictions, first_date)
+        except Exception as e:
+            print(f"✗ Could not log forecast for product {product_id}: {e}")
+    return predictions
+
+def overloaded_response(error):
+    response = jsonify({'success': False, 'error': str(error), 'retry_after': error.retry_after})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
 @app.route('/api/predict-demand', methods=['POST'])
 def predict_demand():
     try:
@@ -228,15 +600,12 @@ def predict_demand():
         if not product_id:
             return jsonify({'success': False, 'error': 'product_id is required'}), 400
         
-        if not os.path.exists('inventory_model.pkl'):
+        model = get_model()
+        if model is None:
             return jsonify({'success': False, 'error': 'Model not found. Please train the model first.'}), 404
         
-        model = load_model('inventory_model.pkl')
-        
-        df = load_sales_data()
-        df_with_features = create_features(df)
-        
-        predictions = predict_future_demand(model, product_id, days_ahead, df_with_features)
+        key = (get_db_path(), id(model), product_id, days_ahead)
+        predictions, _ = forecast_flights.do(key, forecast_limit.run, run_forecast, model, product_id, days_ahead)
         
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -254,6 +623,124 @@ def predict_demand():
             'predictions': predictions
         })
     
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+_residual_cache = {}
+_residual_lock = threading.Lock()
+
+def get_forecast_residuals(model):
+    """Hold-out residuals of the current model on this store's sales, cached per model"""
+    key = (get_db_path(), id(model))
+    with _residual_lock:
+        if key not in _residual_cache:
+            for stale in [k for k in _residual_cache if k[0] == key[0]]:
+                del _residual_cache[stale]
+            training_frame = get_demand_matrix().training_frame()
+            _residual_cache[key] = stockout_sim.split_residuals(model, training_frame)
+        return _residual_cache[key]
+
+SIM_FORECAST_CHUNK = int(os.environ.get('SIM_FORECAST_CHUNK', 500))
+
+def stockout_point_forecasts(model, product_ids, days):
+    """Point forecasts from the demand matrix, rolled forward SIM_FORECAST_CHUNK products at a time"""
+    matrix = get_demand_matrix()
+    forecasts = np.zeros((len(product_ids), days), dtype=np.float32)
+    for start in range(0, len(product_ids), SIM_FORECAST_CHUNK):
+        rows, chunk_ids, histories, last_dates = [], [], [], []
+        for row in range(start, min(start + SIM_FORECAST_CHUNK, len(product_ids))):
+            recent_sales, last_date = matrix.recent_history(product_ids[row])
+            if recent_sales:
+                rows.append(row)
+                chunk_ids.append(product_ids[row])
+                histories.append(recent_sales)
+                last_dates.append(last_date)
+        if rows:
+            forecasts[rows] = forecast_batch(model, chunk_ids, histories, last_dates, days)
+    return forecasts
+
+def run_stockout_simulation(model, product_ids, on_hand, incoming, days, paths, seed=None):
+    """Point forecasts for the products, then the Monte Carlo run around them"""
+    forecasts = stockout_point_forecasts(model, product_ids, days)
+    by_product, pooled = get_forecast_residuals(model)
+    residuals, lengths = stockout_sim.residual_table(product_ids, by_product, pooled)
+    return forecasts, stockout_sim.simulate_stockouts(forecasts, residuals, lengths, on_hand, incoming, paths, seed)
+
+@app.route('/api/simulate-stockout', methods=['POST'])
+def simulate_stockout():
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            days = int(data.get('days', 14))
+            paths = int(data.get('paths', 2000))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'days and paths must be integers'}), 400
+        product_ids = data.get('product_ids')
+        
+        if not 1 <= days <= 90 or not 1 <= paths <= 100000:
+            return jsonify({'success': False, 'error': 'days must be 1-90 and paths 1-100000'}), 400
+        if product_ids is not None and not isinstance(product_ids, list):
+            return jsonify({'success': False, 'error': 'product_ids must be a list'}), 400
+        
+        pending_purchases = data.get('pending_purchases', [])
+        if not isinstance(pending_purchases, list) or not all(isinstance(purchase, dict) for purchase in pending_purchases):
+            return jsonify({'success': False, 'error': 'pending_purchases must be a list of objects'}), 400
+        for purchase in pending_purchases:
+            quantity = purchase.get('quantity', 0)
+            arrival = purchase.get('days_until_arrival', 0)
+            if any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in (quantity, arrival)):
+                return jsonify({'success': False, 'error': 'pending_purchases quantity and days_until_arrival must be numbers'}), 400
+        
+        model = get_model()
+        if model is None:
+            return jsonify({'success': False, 'error': 'Model not found. Please train the model first.'}), 404
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT p.ProductID, p.ProductName, i.QuantityAvailable
+            FROM Products p
+            JOIN Inventory i ON p.ProductID = i.ProductID
+            ORDER BY p.ProductID
+        ''')
+        rows = [row for row in cursor.fetchall() if product_ids is None or row['ProductID'] in product_ids]
+        conn.close()
+        
+        if not rows:
+            return jsonify({'success': False, 'error': 'No matching products'}), 404
+        
+        index = {row['ProductID']: i for i, row in enumerate(rows)}
+        
+        # Stock still on its way, as [{product_id, quantity, days_until_arrival}]
+        incoming = np.zeros((len(rows), days), dtype=np.float32)
+        for purchase in pending_purchases:
+            row = index.get(purchase.get('product_id'))
+            arrival = int(purchase.get('days_until_arrival', 0))
+            if row is not None and 0 <= arrival < days:
+                incoming[row, arrival] += purchase.get('quantity', 0)
+        
+        on_hand = [row['QuantityAvailable'] for row in rows]
+        forecasts, results = forecast_limit.run(
+            run_stockout_simulation, model, list(index), on_hand, incoming, days, paths, data.get('seed')
+        )
+        
+        simulations = []
+        for row, forecast, result in zip(rows, forecasts, results):
+            simulations.append({
+                'product_id': row['ProductID'],
+                'product_name': row['ProductName'],
+                'quantity_available': row['QuantityAvailable'],
+                'forecast_demand': int(forecast.sum()),
+                **result
+            })
+        simulations.sort(key=lambda item: item['stockout_probability'], reverse=True)
+        
+        return jsonify({'success': True, 'days': days, 'paths': paths, 'simulations': simulations})
+    
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -328,6 +815,39 @@ def get_recent_sales():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/export/sales', methods=['GET'])
+def export_sales():
+    try:
+        export_format = request.args.get('format', 'csv')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        compress = request.args.get('gzip') == '1'
+        include_archive = request.args.get('include_archive') == '1'
+        
+        if export_format not in sales_export.FORMATS:
+            return jsonify({'success': False, 'error': 'format must be csv or ndjson'}), 400
+        
+        try:
+            for value in (start_date, end_date):
+                if value:
+                    datetime.strptime(value, '%Y-%m-%d')
+            product_ids = [int(pid) for arg in request.args.getlist('product_id') for pid in arg.split(',') if pid]
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be YYYY-MM-DD and product_id integers'}), 400
+        
+        stream, mimetype = sales_export.FORMATS[export_format]
+        chunks = sales_export.iter_sales_chunks(get_db_path(), start_date, end_date, product_ids, include_archive)
+        filename = f"sales.{export_format}{'.gz' if compress else ''}"
+        
+        return Response(
+            sales_export.encode_stream(stream(chunks), compress),
+            mimetype='application/gzip' if compress else mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/delete-sale', methods=['POST'])
 def delete_sale():
     try:
@@ -340,7 +860,7 @@ def delete_sale():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT ProductID, QuantitySold FROM Sales WHERE SaleID = ?', (sale_id,))
+        cursor.execute('SELECT ProductID, SaleDate, QuantitySold FROM Sales WHERE SaleID = ?', (sale_id,))
         result = cursor.fetchone()
         
         if not result:
@@ -351,6 +871,8 @@ def delete_sale():
         quantity_sold = result['QuantitySold']
         
         cursor.execute('DELETE FROM Sales WHERE SaleID = ?', (sale_id,))
+        if MONITOR_PREDICTIONS:
+            accuracy_monitor.record_actual(cursor, product_id, result['SaleDate'], -quantity_sold)
         
         cursor.execute(
             'UPDATE Inventory SET QuantityAvailable = QuantityAvailable + ?, LastUpdated = ? WHERE ProductID = ?',
@@ -359,6 +881,7 @@ def delete_sale():
         
         conn.commit()
         conn.close()
+        invalidate_demand_matrix()
         
         return jsonify({
             'success': True,
@@ -368,6 +891,63 @@ def delete_sale():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def record_sale(cursor, product_id, quantity_sold, sale_date):
+    """Insert a sale and decrement stock; returns total amount and new quantity"""
+    cursor.execute('SELECT UnitPrice FROM Products WHERE ProductID = ?', (product_id,))
+    result = cursor.fetchone()
+    
+    if not result:
+        raise LookupError('Product not found')
+    
+    unit_price = result['UnitPrice']
+    total_amount = quantity_sold * unit_price
+    
+    cursor.execute(
+        'INSERT INTO Sales (ProductID, SaleDate, SaleDay, QuantitySold, TotalAmount) VALUES (?, ?, ?, ?, ?)',
+        (product_id, sale_date, day_keys.to_day(sale_date), quantity_sold, total_amount)
+    )
+    
+    cursor.execute(
+        'UPDATE Inventory SET QuantityAvailable = QuantityAvailable - ?, LastUpdated = ? WHERE ProductID = ?',
+        (quantity_sold, datetime.now(), product_id)
+    )
+    
+    cursor.execute('SELECT QuantityAvailable FROM Inventory WHERE ProductID = ?', (product_id,))
+    row = cursor.fetchone()
+    
+    if MONITOR_PREDICTIONS:
+        accuracy_monitor.record_actual(cursor, product_id, sale_date, quantity_sold)
+    
+    return {'total_amount': total_amount, 'new_quantity': row['QuantityAvailable'] if row else None}
+
+def record_purchase(cursor, product_id, quantity_purchased):
+    """Increment stock for a product; returns the new quantity"""
+    cursor.execute('SELECT ProductID FROM Products WHERE ProductID = ?', (product_id,))
+    if not cursor.fetchone():
+        raise LookupError('Product not found')
+    
+    cursor.execute(
+        'UPDATE Inventory SET QuantityAvailable = QuantityAvailable + ?, LastUpdated = ? WHERE ProductID = ?',
+        (quantity_purchased, datetime.now(), product_id)
+    )
+    
+    cursor.execute('SELECT QuantityAvailable FROM Inventory WHERE ProductID = ?', (product_id,))
+    return {'new_quantity': cursor.fetchone()['QuantityAvailable']}
+
+def apply_write(operation, *args):
+    """Run a mutation through the group-commit queue if enabled, else in its own transaction"""
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        return write_queue.submit(operation, *args).result()
+    
+    conn = get_db_connection()
+    try:
+        result = operation(conn.cursor(), *args)
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
 @app.route('/api/add-sale', methods=['POST'])
 def add_sale():
     try:
@@ -379,38 +959,24 @@ def add_sale():
         if not product_id or not quantity_sold:
             return jsonify({'success': False, 'error': 'product_id and quantity_sold are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT UnitPrice FROM Products WHERE ProductID = ?', (product_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return jsonify({'success': False, 'error': 'Product not found'}), 404
-        
-        unit_price = result['UnitPrice']
-        total_amount = quantity_sold * unit_price
-        
-        cursor.execute(
-            'INSERT INTO Sales (ProductID, SaleDate, QuantitySold, TotalAmount) VALUES (?, ?, ?, ?)',
-            (product_id, sale_date, quantity_sold, total_amount)
-        )
-        
-        cursor.execute(
-            'UPDATE Inventory SET QuantityAvailable = QuantityAvailable - ?, LastUpdated = ? WHERE ProductID = ?',
-            (quantity_sold, datetime.now(), product_id)
-        )
+        try:
+            sale_day = datetime.strptime(str(sale_date), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'success': False, 'error': 'sale_date must be YYYY-MM-DD'}), 400
+        if sale_day > datetime.now().date():
+            return jsonify({'success': False, 'error': 'sale_date cannot be in the future'}), 400
         
-        conn.commit()
-        conn.close()
+        result = apply_write(record_sale, product_id, quantity_sold, sale_date)
         
         return jsonify({
             'success': True,
             'message': 'Sale added successfully',
-            'total_amount': total_amount
+            'total_amount': result['total_amount'],
+            'new_quantity': result['new_quantity']
         })
     
+    except LookupError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -424,36 +990,61 @@ def add_purchase():
         if not product_id or not quantity_purchased:
             return jsonify({'success': False, 'error': 'product_id and quantity_purchased are required'}), 400
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT ProductID FROM Products WHERE ProductID = ?', (product_id,))
-        if not cursor.fetchone():
-            conn.close()
-            return jsonify({'success': False, 'error': 'Product not found'}), 404
-        
-        cursor.execute(
-            'UPDATE Inventory SET QuantityAvailable = QuantityAvailable + ?, LastUpdated = ? WHERE ProductID = ?',
-            (quantity_purchased, datetime.now(), product_id)
-        )
-        
-        cursor.execute('SELECT QuantityAvailable FROM Inventory WHERE ProductID = ?', (product_id,))
-        new_quantity = cursor.fetchone()['QuantityAvailable']
-        
-        conn.commit()
-        conn.close()
+        result = apply_write(record_purchase, product_id, quantity_purchased)
         
         return jsonify({
             'success': True,
             'message': 'Stock updated successfully',
             'product_id': product_id,
             'quantity_added': quantity_purchased,
-            'new_quantity': new_quantity
+            'new_quantity': result['new_quantity']
         })
     
+    except LookupError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/write-queue/stats', methods=['GET'])
+def get_write_queue_stats():
+    write_queue = get_write_queue()
+    if write_queue is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, 'stats': write_queue.stats()})
+
+_scored_through = {}
+
+def score_past_forecast_days():
+    """Score finished forecast days without sales as zero demand, once per store database per day"""
+    today = datetime.now().date()
+    db_path = get_db_path()
+    if _scored_through.get(db_path) != today:
+        apply_write(accuracy_monitor.score_past_days, today)
+        _scored_through[db_path] = today
+
+@app.route('/api/model-health', methods=['GET'])
+def get_model_health():
+    try:
+        product_id = request.args.get('product_id', type=int)
+        score_past_forecast_days()
+        conn = get_db_connection()
+        health = accuracy_monitor.model_health(conn, product_id)
+        conn.close()
+        return jsonify({'success': True, 'enabled': MONITOR_PREDICTIONS, **health})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/forecast-stats', methods=['GET'])
+def get_forecast_stats():
+    return jsonify({
+        'success': True,
+        'single_flight': forecast_flights.stats(),
+        'concurrency': forecast_limit.stats(),
+        'inference_batcher': get_inference_batcher().stats() if INFERENCE_BATCH_ENABLED else None,
+        'model_partitions': _model_cache['model'].stats() if PARTITIONED_MODEL and _model_cache['model'] else None
+    })
+
 @app.route('/api/suppliers', methods=['GET'])
 def get_suppliers():
     try:
@@ -499,6 +1090,7 @@ def add_product():
             return jsonify({'success': False, 'error': 'Invalid data types'}), 400
         
         conn = get_db_connection()
+        ensure_search_index(conn)
         cursor = conn.cursor()
         
         cursor.execute(
@@ -513,6 +1105,7 @@ def add_product():
             (product_id, initial_quantity, min_stock_level, reorder_point, datetime.now())
         )
         
+        product_search.index_product(cursor, product_id)
         conn.commit()
         
         return jsonify({
@@ -530,73 +1123,111 @@ def add_product():
         if conn:
             conn.close()
 
+def fetch_dashboard_stats(conn, top_n=5):
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT COUNT(*) as count FROM Products')
+    total_products = cursor.fetchone()['count']
+    
+    cursor.execute('''
+        SELECT COUNT(*) as count 
+        FROM Inventory 
+        WHERE QuantityAvailable <= ReorderPoint
+    ''')
+    low_stock_count = cursor.fetchone()['count']
+    
+    week_ago = day_keys.to_day(datetime.now() - timedelta(days=7))
+    cursor.execute('''
+        SELECT COALESCE(SUM(TotalAmount), 0) as total
+        FROM Sales
+        WHERE SaleDay >= ?
+    ''', (week_ago,))
+    weekly_sales = cursor.fetchone()['total']
+    
+    cursor.execute('''
+        SELECT COALESCE(SUM(QuantitySold), 0) as total
+        FROM Sales
+        WHERE SaleDay >= ?
+    ''', (week_ago,))
+    weekly_units = cursor.fetchone()['total']
+    
+    cursor.execute('''
+        SELECT 
+            p.ProductName,
+            SUM(s.QuantitySold) as TotalSold
+        FROM Sales s
+        JOIN Products p ON s.ProductID = p.ProductID
+        WHERE s.SaleDay >= ?
+        GROUP BY p.ProductID, p.ProductName
+        ORDER BY TotalSold DESC
+        LIMIT ?
+    ''', (week_ago, -1 if top_n is None else top_n))
+    
+    top_products = []
+    for row in cursor.fetchall():
+        top_products.append({
+            'product_name': row['ProductName'],
+            'total_sold': row['TotalSold']
+        })
+    
+    return {
+        'total_products': total_products,
+        'low_stock_alerts': low_stock_count,
+        'weekly_sales': weekly_sales,
+        'weekly_units': weekly_units,
+        'top_products': top_products
+    }
+
+def merge_dashboard_stats(results, top_n=5):
+    """Combine per-store dashboard stats; top products are summed by name across stores"""
+    merged = {'total_products': 0, 'low_stock_alerts': 0, 'weekly_sales': 0, 'weekly_units': 0}
+    sold_by_name = {}
+    for _, stats in results:
+        for key in merged:
+            merged[key] += stats[key]
+        for product in stats['top_products']:
+            sold_by_name[product['product_name']] = sold_by_name.get(product['product_name'], 0) + product['total_sold']
+    
+    top_products = sorted(sold_by_name.items(), key=lambda item: item[1], reverse=True)[:top_n]
+    merged['top_products'] = [{'product_name': name, 'total_sold': total} for name, total in top_products]
+    merged['stores'] = len(results)
+    return merged
+
 @app.route('/api/dashboard-stats', methods=['GET'])
 def get_dashboard_stats():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) as count FROM Products')
-        total_products = cursor.fetchone()['count']
-        
-        cursor.execute('''
-            SELECT COUNT(*) as count 
-            FROM Inventory 
-            WHERE QuantityAvailable <= ReorderPoint
-        ''')
-        low_stock_count = cursor.fetchone()['count']
-        
-        week_ago = (datetime.now() - timedelta(days=7)).date()
-        cursor.execute('''
-            SELECT COALESCE(SUM(TotalAmount), 0) as total
-            FROM Sales
-            WHERE SaleDate >= ?
-        ''', (week_ago,))
-        weekly_sales = cursor.fetchone()['total']
-        
-        cursor.execute('''
-            SELECT COALESCE(SUM(QuantitySold), 0) as total
-            FROM Sales
-            WHERE SaleDate >= ?
-        ''', (week_ago,))
-        weekly_units = cursor.fetchone()['total']
-        
-        cursor.execute('''
-            SELECT 
-                p.ProductName,
-                SUM(s.QuantitySold) as TotalSold
-            FROM Sales s
-            JOIN Products p ON s.ProductID = p.ProductID
-            WHERE s.SaleDate >= ?
-            GROUP BY p.ProductID, p.ProductName
-            ORDER BY TotalSold DESC
-            LIMIT 5
-        ''', (week_ago,))
-        
-        top_products = []
-        for row in cursor.fetchall():
-            top_products.append({
-                'product_name': row['ProductName'],
-                'total_sold': row['TotalSold']
-            })
-        
-        conn.close()
+        if request_store_id() == stores.ALL_STORES:
+            stats = merge_dashboard_stats(stores.fan_out(lambda conn: fetch_dashboard_stats(conn, top_n=None)))
+        else:
+            conn = get_db_connection()
+            stats = fetch_dashboard_stats(conn)
+            conn.close()
         
-        return jsonify({
-            'success': True,
-            'total_products': total_products,
-            'low_stock_alerts': low_stock_count,
-            'weekly_sales': round(weekly_sales, 2),
-            'weekly_units': weekly_units,
-            'top_products': top_products
-        })
+        stats['weekly_sales'] = round(stats['weekly_sales'], 2)
+        return jsonify({'success': True, **stats})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    ready = _startup['warm']
+    status = 200 if ready else 503
+    return jsonify({
+        'success': ready,
+        'ready': ready,
+        'model_loaded': _model_cache['model'] is not None,
+        'snapshot_version': _sales_snapshot.version if _sales_snapshot is not None else None,
+        'startup_ms': {name: round(seconds * 1000, 1) for name, seconds in _startup['timings'].items()},
+        'pid': os.getpid()
+    }), status
+
 @app.route('/favicon.ico')
 def favicon():
     return '', 204
 
+_startup['timings']['import_app'] = time.perf_counter() - _module_start
+
 if __name__ == '__main__':
+    start_warm_up()
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+import app
+import day_keys
+from app import create_features, downcast_features
+from demand_matrix import DemandMatrix
+
+SAMPLE_PRODUCTS = [
+    ('Wireless Mouse', 'Electronics', 599),
+    ('USB Keyboard', 'Electronics', 1299),
+    ('Monitor Stand', 'Office Supplies', 899),
+    ('Desk Lamp', 'Office Supplies', 599),
+    ('External Hard Drive', 'Electronics', 4999),
+    ('Webcam HD', 'Electronics', 2499),
+    ('Office Chair Mat', 'Office Supplies', 1299),
+    ('Cable Organizer', 'Office Supplies', 299),
+    ('Bluetooth Speaker', 'Electronics', 1999),
+    ('Smart Watch', 'Electronics', 9999)
+]
+
+def frame_megabytes(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def benchmark_sales_memory(rows=1_000_000, products=1000):
+    """Compare the joined sales frame with the compact series + dimension table"""
+    print("="*60)
+    print("SALES FRAME MEMORY BENCHMARK")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        conn = make_sales_db(db_path, rows, products)
+        make_products_table(conn, products)
+        conn.close()
+
+        wide = app.load_sales_data(db_path=db_path)
+        compact = app.load_sales_series(db_path)
+        dimension = app.load_product_dimension(db_path)
+
+    wide_mb = frame_megabytes(wide)
+    compact_mb = frame_megabytes(compact) + frame_megabytes(dimension)
+
+    start_time = time.time()
+    wide_features_mb = frame_megabytes(create_features(wide))
+    wide_time = time.time() - start_time
+
+    start_time = time.time()
+    compact_features_mb = frame_megabytes(downcast_features(create_features(compact, copy=False)))
+    compact_time = time.time() - start_time
+
+    scale = 1_000_000 / rows
+    print(f"\nRaw sales frame ({rows:,} rows, {products:,} products):")
+    print(f"  Joined frame:      {wide_mb * scale:.1f} MB per million rows")
+    print(f"  Compact + dim:     {compact_mb * scale:.1f} MB per million rows")
+    print(f"  Saving:            {(wide_mb - compact_mb) * scale:.1f} MB per million rows ({(1 - compact_mb / wide_mb) * 100:.1f}%)")
+
+    print("\nFeature frame:")
+    print(f"  Joined frame:      {wide_features_mb * scale:.1f} MB per million rows ({wide_time:.2f}s)")
+    print(f"  Compact frame:     {compact_features_mb * scale:.1f} MB per million rows ({compact_time:.2f}s)")
+    print(f"  Saving:            {(wide_features_mb - compact_features_mb) * scale:.1f} MB per million rows ({(1 - compact_features_mb / wide_features_mb) * 100:.1f}%)")
+
+    return {
+        'wide_mb_per_million': wide_mb * scale,
+        'compact_mb_per_million': compact_mb * scale,
+        'wide_features_mb_per_million': wide_features_mb * scale,
+        'compact_features_mb_per_million': compact_features_mb * scale
+    }
+
+def run_concurrent_forecasts(model, threads, forecasts_per_thread, days_ahead):
+    """Latencies (ms) of forecasts issued from many threads at once, plus wall time"""
+    latencies = []
+    lock = threading.Lock()
+    history = [20, 18, 25, 22, 19, 24, 21] * 5
+
+    def client(thread_id):
+        for i in range(forecasts_per_thread):
+            start_time = time.perf_counter()
+            app.forecast_from_history(model, (thread_id * forecasts_per_thread + i) % 10 + 1, history, '2025-11-25', days_ahead)
+            with lock:
+                latencies.append((time.perf_counter() - start_time) * 1000)
+
+    start_time = time.perf_counter()
+    workers = [threading.Thread(target=client, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return np.array(latencies), time.perf_counter() - start_time
+
+def benchmark_inference_batching(threads=32, forecasts_per_thread=20, days_ahead=7):
+    """Forecast throughput and latency with and without the inference batcher"""
+    print("="*60)
+    print("INFERENCE BATCHING BENCHMARK")
+    print("="*60)
+
+    model = app.load_model('inventory_model.pkl')
+    if model is None:
+        print("✗ inventory_model.pkl not found. Train the model first.")
+        return None
+
+    results = {}
+    for enabled in (False, True):
+        app.INFERENCE_BATCH_ENABLED = enabled
+        latencies, seconds = run_concurrent_forecasts(model, threads, forecasts_per_thread, days_ahead)
+        label = 'batched' if enabled else 'per-request'
+        results[label] = {
+            'forecasts_per_second': len(latencies) / seconds,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99))
+        }
+        print(f"\n{label} ({threads} threads x {forecasts_per_thread} forecasts, {days_ahead} days each):")
+        print(f"  Throughput:        {results[label]['forecasts_per_second']:.1f} forecasts/s")
+        print(f"  Latency p50/p99:   {results[label]['p50_ms']:.1f} / {results[label]['p99_ms']:.1f} ms")
+
+    stats = app.get_inference_batcher().stats()
+    print(f"\nBatcher: {stats['batches']} batches, {stats['avg_batch_rows']:.1f} rows/batch, "
+          f"{stats['avg_added_latency_ms']:.2f} ms average added latency")
+    app.INFERENCE_BATCH_ENABLED = False
+    results['batcher'] = stats
+    return results
+
+def make_sales_db(path, rows, products=1000, days=1500, seed=42):
+    """SQLite Sales table with both TEXT SaleDate and integer SaleDay, indexed like db_setup"""
+    rng = np.random.default_rng(seed)
+    start_day = day_keys.to_day('2020-01-01')
+    sale_days = start_day + np.sort(rng.integers(0, days, size=rows))
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE Sales (SaleID INTEGER PRIMARY KEY, ProductID INTEGER, SaleDate DATE, SaleDay INTEGER, QuantitySold INTEGER, TotalAmount REAL)')
+    dates = {day: day_keys.from_day(day).isoformat() for day in np.unique(sale_days).tolist()}
+    conn.executemany(
+        'INSERT INTO Sales (ProductID, SaleDate, SaleDay, QuantitySold, TotalAmount) VALUES (?, ?, ?, ?, ?)',
+        zip(rng.integers(1, products + 1, size=rows).tolist(), (dates[day] for day in sale_days.tolist()),
+            sale_days.tolist(), rng.integers(1, 40, size=rows).tolist(), rng.random(rows).tolist())
+    )
+    conn.execute('CREATE INDEX idx_sales_date ON Sales(SaleDate)')
+    conn.execute('CREATE INDEX idx_sales_product_date ON Sales(ProductID, SaleDate)')
+    day_keys.ensure_day_keys(conn)
+    return conn
+
+def make_products_table(conn, products=1000):
+    """Products table like db_setup's, cycling through SAMPLE_PRODUCTS"""
+    conn.execute('CREATE TABLE Products (ProductID INTEGER PRIMARY KEY, ProductName TEXT, Category TEXT, UnitPrice REAL)')
+    rows = []
+    for pid in range(1, products + 1):
+        name, category, price = SAMPLE_PRODUCTS[(pid - 1) % len(SAMPLE_PRODUCTS)]
+        rows.append((pid, f"{name} #{pid}", category, price))
+    conn.executemany('INSERT INTO Products VALUES (?, ?, ?, ?)', rows)
+    conn.commit()
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+def benchmark_day_keys(rows=1_000_000, products=1000):
+    """Text SaleDate parsing versus integer SaleDay keys with the calendar lookup table"""
+    print("="*60)
+    print("INTEGER DAY KEY BENCHMARK")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = make_sales_db(os.path.join(tmp_dir, 'bench.db'), rows, products)
+        last_day = conn.execute('SELECT MAX(SaleDay) FROM Sales').fetchone()[0]
+        week_ago_day = last_day - 7
+        week_ago = day_keys.from_day(week_ago_day).isoformat()
+
+        def text_features():
+            df = pd.read_sql_query('SELECT ProductID, SaleDate, QuantitySold FROM Sales', conn)
+            dates = pd.to_datetime(df['SaleDate'])
+            return (dates.dt.dayofweek, dates.dt.month, dates.dt.isocalendar().week, dates.dt.day, dates.dt.quarter)
+
+        def day_features():
+            df = pd.read_sql_query('SELECT ProductID, SaleDay, QuantitySold FROM Sales', conn)
+            return day_keys.calendar_columns(df['SaleDay'].to_numpy())
+
+        def text_matrix():
+            df = pd.read_sql_query('''
+                SELECT ProductID, DATE(SaleDate) AS SaleDate, SUM(QuantitySold) AS QuantitySold
+                FROM Sales GROUP BY ProductID, DATE(SaleDate)
+            ''', conn)
+            return DemandMatrix.from_sales(df)
+
+        def day_matrix():
+            return DemandMatrix.from_db(conn)
+
+        def text_range():
+            for _ in range(100):
+                conn.execute('SELECT COALESCE(SUM(QuantitySold), 0) FROM Sales WHERE SaleDate >= ?', (week_ago,)).fetchone()
+
+        def day_range():
+            for _ in range(100):
+                conn.execute('SELECT COALESCE(SUM(QuantitySold), 0) FROM Sales WHERE SaleDay >= ?', (week_ago_day,)).fetchone()
+
+        day_keys.calendar_columns([last_day])
+        results = {}
+        for label, text_fn, day_fn in (
+            ('Per-row calendar features', text_features, day_features),
+            ('Demand matrix build', text_matrix, day_matrix),
+            ('Last-7-days query x100', text_range, day_range)
+        ):
+            text_time, day_time = best_of(text_fn), best_of(day_fn)
+            results[label] = {'text_seconds': text_time, 'day_seconds': day_time}
+            print(f"\n{label} ({rows:,} sales, {products:,} products):")
+            print(f"  TEXT SaleDate:     {text_time * 1000:.0f} ms")
+            print(f"  Integer SaleDay:   {day_time * 1000:.0f} ms ({text_time / day_time:.1f}x faster)")
+        conn.close()
+    return results
+
+BENCHMARKS = {
+    'memory': benchmark_sales_memory,
+    'batching': benchmark_inference_batching,
+    'day-keys': benchmark_day_keys
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Error: Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
@@ -0,0 +1,142 @@
+import sys
+import sqlite3
+from datetime import date, datetime
+
+EPOCH = date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+# Calendar rows kept precomputed; ensure_day_keys extends the table to cover all sales
+CALENDAR_START = date(2000, 1, 1)
+CALENDAR_END = date(2049, 12, 31)
+CALENDAR_COLUMNS = ['DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter']
+
+_calendar = {}
+
+def day_sql(column='SaleDate'):
+    """SQL expression for the epoch day (days since 1970-01-01) of a date or datetime column"""
+    return f"CAST(julianday({column}) - 2440587.5 AS INTEGER)"
+
+def to_day(value):
+    """Epoch day of a date, datetime, Timestamp or 'YYYY-MM-DD[ ...]' string (integers pass through)"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.toordinal() - EPOCH_ORDINAL
+    return int(value)
+
+def today():
+    """Epoch day of the local date; sales after it are not part of any demand series"""
+    return date.today().toordinal() - EPOCH_ORDINAL
+
+def from_day(day):
+    return date.fromordinal(int(day) + EPOCH_ORDINAL)
+
+def calendar_row(day):
+    """(Day, Date, DayOfWeek, Month, WeekOfYear, DayOfMonth, Quarter, Year) for an epoch day"""
+    d = from_day(day)
+    return (day, d.isoformat(), d.weekday(), d.month, d.isocalendar()[1], d.day, (d.month - 1) // 3 + 1, d.year)
+
+def ensure_calendar(conn, first_day=None, last_day=None):
+    """Create the Calendar lookup table and fill any missing days in [first_day, last_day]"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Calendar (
+            Day INTEGER PRIMARY KEY,
+            Date DATE,
+            DayOfWeek INTEGER,
+            Month INTEGER,
+            WeekOfYear INTEGER,
+            DayOfMonth INTEGER,
+            Quarter INTEGER,
+            Year INTEGER
+        )
+    ''')
+    first_day = min(to_day(CALENDAR_START), first_day if first_day is not None else to_day(CALENDAR_START))
+    last_day = max(to_day(CALENDAR_END), last_day if last_day is not None else to_day(CALENDAR_END))
+    low, high, count = conn.execute('SELECT MIN(Day), MAX(Day), COUNT(*) FROM Calendar').fetchone()
+    if count and low <= first_day and high >= last_day and count == high - low + 1:
+        return 0
+    cursor = conn.executemany(
+        'INSERT OR IGNORE INTO Calendar VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (calendar_row(day) for day in range(first_day, last_day + 1))
+    )
+    return cursor.rowcount
+
+def ensure_day_keys(conn):
+    """Migrate a database to integer day keys; safe to run on every start.
+
+    Adds Sales.SaleDay (epoch day of SaleDate) with a backfill, indexes for
+    range scans on it, triggers that fill it for writers that only set
+    SaleDate, and the Calendar table. Returns True if anything was migrated.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Sales)')]
+    migrated = 'SaleDay' not in columns
+    if migrated:
+        conn.execute('ALTER TABLE Sales ADD COLUMN SaleDay INTEGER')
+        conn.execute(f'UPDATE Sales SET SaleDay = {day_sql()}')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_day ON Sales(SaleDay)')
+    # Covers the per-product, per-day quantity sums behind DemandMatrix.from_db
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_product_day ON Sales(ProductID, SaleDay, QuantitySold)')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS Sales_SaleDay_insert AFTER INSERT ON Sales
+        WHEN NEW.SaleDay IS NULL
+        BEGIN
+            UPDATE Sales SET SaleDay = {day_sql('NEW.SaleDate')} WHERE SaleID = NEW.SaleID;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS Sales_SaleDay_update AFTER UPDATE OF SaleDate ON Sales
+        BEGIN
+            UPDATE Sales SET SaleDay = {day_sql('NEW.SaleDate')} WHERE SaleID = NEW.SaleID;
+        END
+    ''')
+    first_day, last_day = conn.execute('SELECT MIN(SaleDay), MAX(SaleDay) FROM Sales').fetchone()
+    migrated = ensure_calendar(conn, first_day, last_day) > 0 or migrated
+    conn.commit()
+    return migrated
+
+def _compute_calendar(days):
+    import pandas as pd
+
+    dates = pd.to_datetime(days, unit='D')
+    return {
+        'DayOfWeek': dates.dayofweek.values.astype('int64'),
+        'Month': dates.month.values.astype('int64'),
+        'WeekOfYear': dates.isocalendar().week.values.astype('int64'),
+        'DayOfMonth': dates.day.values.astype('int64'),
+        'Quarter': dates.quarter.values.astype('int64')
+    }
+
+def calendar_columns(days):
+    """Calendar features for an array of epoch days, looked up in a per-process table"""
+    import numpy as np
+
+    if not _calendar:
+        first_day = to_day(CALENDAR_START)
+        table = _compute_calendar(np.arange(first_day, to_day(CALENDAR_END) + 1))
+        table['first_day'] = first_day
+        _calendar.update(table)
+    days = np.asarray(days, dtype=np.int64)
+    offsets = days - _calendar['first_day']
+    if len(days) and (offsets.min() < 0 or offsets.max() >= len(_calendar['Month'])):
+        return _compute_calendar(days)
+    return {name: _calendar[name][offsets] for name in CALENDAR_COLUMNS}
+
+def calendar_of(day):
+    """Calendar features of a single epoch day as a dict"""
+    return dict(zip(CALENDAR_COLUMNS, calendar_row(day)[2:7]))
+
+if __name__ == '__main__':
+    import stores
+
+    db_paths = sys.argv[1:] or [stores.db_path(store_id) for store_id in stores.all_store_ids()]
+    if not db_paths:
+        print("Error: No databases found")
+        sys.exit(1)
+    for db_path in db_paths:
+        conn = sqlite3.connect(db_path)
+        migrated = ensure_day_keys(conn)
+        sale_count = conn.execute('SELECT COUNT(*) FROM Sales').fetchone()[0]
+        conn.close()
+        status = "migrated" if migrated else "already up to date"
+        print(f"✓ {db_path}: {sale_count} sales, {status}")
@@ -1,12 +1,22 @@
 import sqlite3
+import os
 import random
 from datetime import datetime, timedelta
 import numpy as np
+import accuracy_monitor
+import product_search
+import day_keys
 
-def create_database():
-    conn = sqlite3.connect('inventory.db')
+def create_database(db_path='inventory.db'):
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    cursor.execute('DROP TABLE IF EXISTS TrainingRuns')
+    cursor.execute('DROP TABLE IF EXISTS ReorderRuns')
+    cursor.execute('DROP TABLE IF EXISTS AccuracyStats')
+    cursor.execute('DROP TABLE IF EXISTS Predictions')
+    cursor.execute('DROP TABLE IF EXISTS ProductSearch')
+    cursor.execute('DROP TABLE IF EXISTS Calendar')
     cursor.execute('DROP TABLE IF EXISTS Sales')
     cursor.execute('DROP TABLE IF EXISTS Inventory')
     cursor.execute('DROP TABLE IF EXISTS Products')
@@ -49,12 +59,18 @@ def create_database():
             SaleID INTEGER PRIMARY KEY AUTOINCREMENT,
             ProductID INTEGER,
             SaleDate DATE,
+            SaleDay INTEGER,
             QuantitySold INTEGER,
             TotalAmount REAL,
             FOREIGN KEY (ProductID) REFERENCES Products(ProductID)
         )
     ''')
     
+    cursor.execute('CREATE INDEX idx_sales_date ON Sales(SaleDate)')
+    cursor.execute('CREATE INDEX idx_sales_product_date ON Sales(ProductID, SaleDate)')
+    day_keys.ensure_day_keys(conn)
+    accuracy_monitor.ensure_tables(cursor)
+    
     conn.commit()
     return conn, cursor
 
@@ -111,6 +127,7 @@ def insert_sample_data(conn, cursor):
         )
     
     conn.commit()
+    product_search.ensure_index(conn)
 
 def generate_sales_data(conn, cursor, days=180):
     start_date = datetime.now() - timedelta(days=days)
@@ -153,14 +170,22 @@ def generate_sales_data(conn, cursor, days=180):
             if quantity > 0:
                 total_amount = quantity * unit_price
                 cursor.execute(
-                    'INSERT INTO Sales (ProductID, SaleDate, QuantitySold, TotalAmount) VALUES (?, ?, ?, ?)',
-                    (product_id, current_date.date(), quantity, total_amount)
+                    'INSERT INTO Sales (ProductID, SaleDate, SaleDay, QuantitySold, TotalAmount) VALUES (?, ?, ?, ?, ?)',
+                    (product_id, current_date.date(), day_keys.to_day(current_date), quantity, total_amount)
                 )
     
     conn.commit()
 
 if __name__ == '__main__':
-    conn, cursor = create_database()
+    import sys
+    import stores
+    
+    # python db_setup.py --store <id> creates a store shard under stores/
+    store_id = sys.argv[2] if len(sys.argv) > 2 and sys.argv[1] == '--store' else None
+    if store_id is not None:
+        os.makedirs(stores.STORES_DIR, exist_ok=True)
+    
+    conn, cursor = create_database(stores.db_path(store_id))
     insert_sample_data(conn, cursor)
     generate_sales_data(conn, cursor, days=180)
     
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import sqlite3
+from datetime import datetime
+
+import sales_archive
+import day_keys
+
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+
+def snapshot_path(db_path='inventory.db', snapshot_dir=SNAPSHOT_DIR):
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(snapshot_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.db")
+
+def create_snapshot(db_path='inventory.db', dest=None):
+    """Point-in-time copy of a database via SQLite's online backup API.
+
+    The whole copy is one backup step, so it sees a single consistent state.
+    That step holds a read lock on the source for the entire copy: in the
+    default rollback-journal mode the app's writers wait until it finishes
+    (in WAL mode they would not). The analytics that follow run on the copy
+    and never block the writers.
+    A sales archive next to the database is copied alongside it, as the
+    snapshot's own *_archive.db. The copy gets a SnapshotInfo row recording
+    its watermark (highest SaleID, hot sale count, latest SaleDate) so
+    results can be tied to the exact data they came from.
+    """
+    dest = dest or snapshot_path(db_path)
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+
+    start_time = time.time()
+    source = sqlite3.connect(db_path, isolation_level=None)
+    target = sqlite3.connect(dest)
+    try:
+        if os.path.exists(sales_archive.archive_path(db_path)):
+            # Copy the archive inside the same read transaction, so a month
+            # being archived meanwhile is in exactly one of the two copies
+            sales_archive.attach_archive(source, db_path)
+            source.execute('BEGIN')
+            source.execute('SELECT 1 FROM Sales LIMIT 1').fetchall()
+            source.execute('SELECT 1 FROM archive.Partitions LIMIT 1').fetchall()
+            archive_target = sqlite3.connect(sales_archive.archive_path(dest))
+            source.backup(archive_target, name='archive')
+            archive_target.close()
+        source.backup(target)
+    finally:
+        source.close()
+
+    day_keys.ensure_day_keys(target)
+    max_sale_id, sale_count, last_sale_date = target.execute(
+        'SELECT COALESCE(MAX(SaleID), 0), COUNT(*), MAX(SaleDate) FROM Sales'
+    ).fetchone()
+    info = {
+        'path': dest,
+        'source': os.path.abspath(db_path),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'max_sale_id': max_sale_id,
+        'sale_count': sale_count,
+        'last_sale_date': last_sale_date,
+        'seconds': round(time.time() - start_time, 3)
+    }
+    target.execute('DROP TABLE IF EXISTS SnapshotInfo')
+    target.execute('''
+        CREATE TABLE SnapshotInfo (
+            Source TEXT,
+            CreatedAt DATETIME,
+            MaxSaleID INTEGER,
+            SaleCount INTEGER,
+            LastSaleDate DATE
+        )
+    ''')
+    target.execute(
+        'INSERT INTO SnapshotInfo VALUES (?, ?, ?, ?, ?)',
+        (info['source'], info['created_at'], max_sale_id, sale_count, last_sale_date)
+    )
+    target.commit()
+    target.close()
+    return info
+
+def remove_snapshot(path):
+    for file_path in (path, sales_archive.archive_path(path)):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+def snapshot_info(path):
+    """Watermark recorded in a snapshot, or None if the file is not a snapshot"""
+    if not os.path.isfile(path):
+        # sqlite3.connect would create an empty database at the path
+        return None
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute('SELECT Source, CreatedAt, MaxSaleID, SaleCount, LastSaleDate FROM SnapshotInfo').fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {
+        'path': path,
+        'source': row[0],
+        'created_at': row[1],
+        'max_sale_id': row[2],
+        'sale_count': row[3],
+        'last_sale_date': row[4]
+    }
+
+def describe(info):
+    return (f"snapshot {info['path']} of {info['source']} at {info['created_at']}: "
+            f"{info['sale_count']} sales up to SaleID {info['max_sale_id']} ({info['last_sale_date']})")
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'inventory.db'
+    if not os.path.exists(db_path):
+        print(f"Error: File not found: {db_path}")
+        sys.exit(1)
+    info = create_snapshot(db_path, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✓ Wrote {describe(info)} ({info['seconds']:.2f}s)")
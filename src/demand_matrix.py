@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+import day_keys
+
+FEATURE_COLUMNS = [
+    'ProductID', 'DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter',
+    'Sales_Lag_7', 'Sales_Lag_14', 'Sales_Lag_30',
+    'Sales_Rolling_7', 'Sales_Rolling_30'
+]
+
+LAGS = (7, 14, 30)
+WINDOWS = (7, 30)
+
+class DemandMatrix:
+    """Dense product x day quantity matrix with explicit zeros for days without sales.
+
+    Row i is product_ids[i], column t is start_date + t days. Lags are column
+    offsets, so Sales_Lag_7 really is seven days ago rather than seven sale
+    rows ago. Each product's history starts at its first sale (first_day);
+    earlier lags fall back to that first day, like bfill() in create_features().
+    """
+
+    def __init__(self, product_ids, start_date, quantities, first_day=None):
+        self.product_ids = np.asarray(product_ids, dtype=np.int64)
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.n_days = quantities.shape[1]
+        self._data = np.ascontiguousarray(quantities, dtype=np.int32)
+        self._index = {int(pid): i for i, pid in enumerate(self.product_ids)}
+        if first_day is None:
+            first_day = np.where(self._data.any(axis=1), (self._data != 0).argmax(axis=1), 0)
+        self.first_day = np.asarray(first_day, dtype=np.int64)
+
+    @classmethod
+    def from_days(cls, product_ids, days, quantities):
+        """Build from parallel arrays of ProductID, epoch day and quantity.
+
+        Sales dated after today are left out, so a mistyped future date cannot
+        move the end of every product's series.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        current = days <= day_keys.today()
+        if not current.all():
+            days = days[current]
+            product_ids = np.asarray(product_ids)[current]
+            quantities = np.asarray(quantities)[current]
+        if len(days) == 0:
+            return cls([], pd.Timestamp.today(), np.zeros((0, 0), dtype=np.int32))
+
+        start_day = days.min()
+        day = days - start_day
+        product_ids, row = np.unique(np.asarray(product_ids), return_inverse=True)
+
+        matrix = np.zeros((len(product_ids), day.max() + 1), dtype=np.int32)
+        np.add.at(matrix, (row, day), np.asarray(quantities, dtype=np.int32))
+
+        first_day = np.full(len(product_ids), matrix.shape[1], dtype=np.int64)
+        np.minimum.at(first_day, row, day)
+        return cls(product_ids, pd.Timestamp(day_keys.from_day(start_day)), matrix, first_day)
+
+    @classmethod
+    def from_sales(cls, df, quantity_col='QuantitySold'):
+        """Build from a frame with ProductID, SaleDate and a quantity column"""
+        days = (pd.to_datetime(df['SaleDate']).dt.normalize() - pd.Timestamp(day_keys.EPOCH)).dt.days
+        return cls.from_days(df['ProductID'].to_numpy(), days.to_numpy(), df[quantity_col].to_numpy())
+
+    @classmethod
+    def from_db(cls, conn, where='', params=(), source='Sales'):
+        """Build from the Sales table (or a sales_archive source), summing quantities per product and day.
+
+        Grouping is on the integer SaleDay key, so no date is parsed here.
+        """
+        rows = conn.execute(f'''
+            SELECT ProductID, SaleDay, SUM(QuantitySold)
+            FROM {source} AS Sales
+            {where}
+            GROUP BY ProductID, SaleDay
+        ''', params).fetchall()
+        data = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        return cls.from_days(data[:, 0], data[:, 1], data[:, 2])
+
+    @property
+    def quantities(self):
+        """View of the filled part of the matrix (n_products x n_days)"""
+        return self._data[:, :self.n_days]
+
+    @property
+    def end_date(self):
+        return self.start_date + pd.Timedelta(days=self.n_days - 1)
+
+    def day_of(self, date):
+        return (pd.Timestamp(date).normalize() - self.start_date).days
+
+    def date_of(self, day):
+        return self.start_date + pd.Timedelta(days=int(day))
+
+    def _ensure_capacity(self, n_days):
+        if n_days <= self._data.shape[1]:
+            return
+        capacity = max(n_days, self._data.shape[1] * 2, 32)
+        grown = np.zeros((self._data.shape[0], capacity), dtype=np.int32)
+        grown[:, :self.n_days] = self.quantities
+        self._data = grown
+
+    def append_day(self, values=None):
+        """Start a new day in place; values maps product_id -> quantity (default zeros)"""
+        self._ensure_capacity(self.n_days + 1)
+        self._data[:, self.n_days] = 0
+        self.n_days += 1
+        for product_id, quantity in (values or {}).items():
+            self.add(product_id, self.end_date, quantity)
+
+    def _ensure_product(self, product_id, day):
+        product_id = int(product_id)
+        if product_id in self._index:
+            return self._index[product_id]
+        self._data = np.vstack([self._data, np.zeros((1, self._data.shape[1]), dtype=np.int32)])
+        self.product_ids = np.append(self.product_ids, product_id)
+        self.first_day = np.append(self.first_day, day)
+        self._index[product_id] = len(self.product_ids) - 1
+        return self._index[product_id]
+
+    def add(self, product_id, date, quantity):
+        """Add quantity to a (product, date) cell, growing days or products as needed (up to today)"""
+        if day_keys.to_day(date) > day_keys.today():
+            raise ValueError(f"{date} is after today")
+        day = self.day_of(date)
+        if day < 0:
+            raise ValueError(f"{date} is before the start of the matrix ({self.start_date.date()})")
+        while day >= self.n_days:
+            self.append_day()
+        row = self._ensure_product(product_id, day)
+        self._data[row, day] += quantity
+        self.first_day[row] = min(self.first_day[row], day)
+
+    def lag(self, k, day=None):
+        """Quantity k days before `day` (default: the last day) for every product"""
+        day = self.n_days - 1 if day is None else day
+        return self._data[np.arange(len(self.product_ids)), np.maximum(day - k, self.first_day)]
+
+    def _cumsum(self):
+        cumsum = np.zeros((len(self.product_ids), self.n_days + 1), dtype=np.int64)
+        np.cumsum(self.quantities, axis=1, out=cumsum[:, 1:])
+        return cumsum
+
+    def rolling_mean(self, window, cumsum=None):
+        """Trailing mean over `window` days for all products and days at once"""
+        cumsum = self._cumsum() if cumsum is None else cumsum
+        days = np.arange(self.n_days)
+        lower = np.maximum(days[None, :] - window + 1, self.first_day[:, None])
+        counts = days[None, :] - lower + 1
+        rows = np.arange(len(self.product_ids))[:, None]
+        totals = cumsum[:, 1:] - cumsum[rows, np.minimum(lower, self.n_days)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+
+    def recent_history(self, product_id, window=30):
+        """Last `window` daily quantities (zeros included) and the matrix end date"""
+        row = self._index.get(int(product_id))
+        if row is None:
+            return [], None
+        start = max(self.n_days - window, self.first_day[row])
+        return self._data[row, start:self.n_days].tolist(), self.end_date
+
+    def training_frame(self):
+        """One feature row per product per day from its first sale onward"""
+        n_products, n_days = len(self.product_ids), self.n_days
+        days = np.arange(n_days)
+        dates = pd.date_range(self.start_date, periods=n_days, freq='D')
+        calendar = day_keys.calendar_columns(day_keys.to_day(self.start_date) + days)
+        rows = np.arange(n_products)[:, None]
+
+        active = days[None, :] >= self.first_day[:, None]
+        cumsum = self._cumsum()
+
+        columns = {
+            'ProductID': np.broadcast_to(self.product_ids[:, None], (n_products, n_days)),
+            'SaleDate': np.broadcast_to(dates.values[None, :], (n_products, n_days)),
+            'QuantitySold': self.quantities,
+            **{name: np.broadcast_to(values, (n_products, n_days)) for name, values in calendar.items()}
+        }
+        for k in LAGS:
+            columns[f'Sales_Lag_{k}'] = self._data[rows, np.maximum(days[None, :] - k, self.first_day[:, None])].astype(np.float64)
+        for window in WINDOWS:
+            columns[f'Sales_Rolling_{window}'] = self.rolling_mean(window, cumsum)
+
+        return pd.DataFrame({name: values[active] for name, values in columns.items()})
@@ -5,63 +5,40 @@ import time
 import pickle
 import sqlite3
 from datetime import datetime, timedelta
+from demand_matrix import DemandMatrix, FEATURE_COLUMNS
+import sales_archive
+import db_snapshot
+import day_keys
 
 def load_model(filename='inventory_model.pkl'):
     with open(filename, 'rb') as f:
         model = pickle.load(f)
     return model
 
-def load_database_data():
-    conn = sqlite3.connect('inventory.db')
+def load_database_data(include_archive=False, db_path='inventory.db'):
+    conn = sqlite3.connect(db_path)
+    day_keys.ensure_day_keys(conn)
+    source = sales_archive.sales_source(conn, db_path, include_archive)
     query = '''
         SELECT 
             s.SaleID,
             s.ProductID,
-            s.SaleDate,
+            s.SaleDay,
             s.QuantitySold,
             s.TotalAmount,
             p.ProductName,
             p.Category,
             p.UnitPrice
-        FROM Sales s
+        FROM {source} AS s
         JOIN Products p ON s.ProductID = p.ProductID
-        ORDER BY s.SaleDate
+        ORDER BY s.SaleDay
     '''
     
-    df = pd.read_sql_query(query, conn)
+    df = pd.read_sql_query(query.format(source=source), conn)
     conn.close()
-    df['SaleDate'] = pd.to_datetime(df['SaleDate'])
+    df.insert(2, 'SaleDate', pd.to_datetime(df.pop('SaleDay'), unit='D'))
     return df
 
-def create_features(df):
-    df = df.copy()
-    
-    df['DayOfWeek'] = df['SaleDate'].dt.dayofweek
-    df['Month'] = df['SaleDate'].dt.month
-    df['WeekOfYear'] = df['SaleDate'].dt.isocalendar().week
-    df['DayOfMonth'] = df['SaleDate'].dt.day
-    df['Quarter'] = df['SaleDate'].dt.quarter
-    
-    product_dfs = []
-    
-    for product_id in df['ProductID'].unique():
-        product_df = df[df['ProductID'] == product_id].copy()
-        product_df = product_df.sort_values(by='SaleDate')
-        
-        product_df['Sales_Lag_7'] = product_df['QuantitySold'].shift(7)
-        product_df['Sales_Lag_14'] = product_df['QuantitySold'].shift(14)
-        product_df['Sales_Lag_30'] = product_df['QuantitySold'].shift(30)
-        
-        product_df['Sales_Rolling_7'] = product_df['QuantitySold'].rolling(window=7, min_periods=1).mean()
-        product_df['Sales_Rolling_30'] = product_df['QuantitySold'].rolling(window=30, min_periods=1).mean()
-        
-        product_dfs.append(product_df)
-    
-    df_with_features = pd.concat(product_dfs, ignore_index=True)
-    df_with_features = df_with_features.bfill().fillna(0)
-    
-    return df_with_features
-
 def prepare_train_test_split(df, test_size=0.25):
     df = df.sort_values(by='SaleDate')
     
@@ -70,21 +47,16 @@ def prepare_train_test_split(df, test_size=0.25):
     train_df = df.iloc[:split_index]
     test_df = df.iloc[split_index:]
     
-    feature_columns = [
-        'ProductID', 'DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter',
-        'Sales_Lag_7', 'Sales_Lag_14', 'Sales_Lag_30',
-        'Sales_Rolling_7', 'Sales_Rolling_30'
-    ]
-    
-    X_train = train_df[feature_columns]
+    X_train = train_df[FEATURE_COLUMNS]
     y_train = train_df['QuantitySold']
     
-    X_test = test_df[feature_columns]
+    X_test = test_df[FEATURE_COLUMNS]
     y_test = test_df['QuantitySold']
     
     return X_train, X_test, y_train, y_test, train_df, test_df
 
-def evaluate_model_performance():
+def evaluate_model_performance(include_archive=False, snapshot=None, keep_snapshot=False):
+    """Evaluate against a point-in-time snapshot: the given one, or a fresh copy of inventory.db"""
     print("="*60)
     print("INVENTORY MANAGEMENT SYSTEM - MODEL EVALUATION")
     print("="*60)
@@ -98,8 +70,18 @@ def evaluate_model_performance():
         return
     
     print("\n2. Loading and preprocessing data...")
-    df = load_database_data()
-    df_with_features = create_features(df)
+    if snapshot is None:
+        info = db_snapshot.create_snapshot('inventory.db')
+    else:
+        info = db_snapshot.snapshot_info(snapshot)
+        if info is None:
+            print(f"   ✗ {snapshot} is not a snapshot. Create one with db_snapshot.py.")
+            return
+    print(f"   ✓ Using {db_snapshot.describe(info)}")
+    df = load_database_data(include_archive, info['path'])
+    if snapshot is None and not keep_snapshot:
+        db_snapshot.remove_snapshot(info['path'])
+    df_with_features = DemandMatrix.from_sales(df).training_frame()
     X_train, X_test, y_train, y_test, train_df, test_df = prepare_train_test_split(df_with_features)
     print(f"   ✓ Data loaded: {len(X_train)} training, {len(X_test)} test samples")
     
@@ -186,8 +168,15 @@ def evaluate_model_performance():
         'rmse': rmse,
         'r2': r2,
         'prediction_time': prediction_time,
-        'avg_query_time': avg_time
+        'avg_query_time': avg_time,
+        'snapshot': info
     }
 
 if __name__ == '__main__':
-    evaluate_model_performance()
+    import argparse
+    parser = argparse.ArgumentParser(description='Evaluate the saved model on a point-in-time snapshot.')
+    parser.add_argument('--archive', action='store_true', help='include archived sales')
+    parser.add_argument('--snapshot', help='evaluate on an existing snapshot instead of a fresh one')
+    parser.add_argument('--keep-snapshot', action='store_true', help='keep the fresh snapshot for reruns')
+    args = parser.parse_args()
+    evaluate_model_performance(args.archive, args.snapshot, args.keep_snapshot)
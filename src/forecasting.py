@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import day_keys
+from demand_matrix import FEATURE_COLUMNS
+
+def future_features(product_id, recent_sales, future_date):
+    """Model feature row for one product on a future date, given its recent daily quantities"""
+    return {
+        'ProductID': product_id,
+        **day_keys.calendar_of(day_keys.to_day(future_date)),
+        'Sales_Lag_7': recent_sales[-7] if len(recent_sales) >= 7 else recent_sales[-1],
+        'Sales_Lag_14': recent_sales[-14] if len(recent_sales) >= 14 else recent_sales[-1],
+        'Sales_Lag_30': recent_sales[-30] if len(recent_sales) >= 30 else recent_sales[-1],
+        'Sales_Rolling_7': np.mean(recent_sales[-7:]) if len(recent_sales) >= 7 else np.mean(recent_sales),
+        'Sales_Rolling_30': np.mean(recent_sales[-30:]) if len(recent_sales) >= 30 else np.mean(recent_sales)
+    }
+
+def predict_rows(model, rows):
+    return model.predict(pd.DataFrame(rows, columns=FEATURE_COLUMNS))
+
+def forecast_batch(model, product_ids, histories, last_dates, days_ahead=7, predict=predict_rows):
+    """Roll several products forward together, with one predict(model, rows) call per day"""
+    histories = [list(recent_sales) for recent_sales in histories]
+    last_dates = [pd.Timestamp(last_date) for last_date in last_dates]
+    predictions = [[] for _ in product_ids]
+
+    for day in range(1, days_ahead + 1):
+        rows = []
+        for product_id, recent_sales, last_date in zip(product_ids, histories, last_dates):
+            features = future_features(product_id, recent_sales, last_date + timedelta(days=day))
+            rows.append([features[col] for col in FEATURE_COLUMNS])
+
+        for i, prediction in enumerate(predict(model, rows)):
+            prediction = max(0, int(round(prediction)))
+            predictions[i].append(prediction)
+            histories[i].append(prediction)
+
+    return predictions
@@ -0,0 +1,117 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+class InferenceBatcher:
+    """Single thread that merges feature rows from concurrent callers into one predict.
+
+    Callers submit rows for a model; the batcher takes up to max_batch rows
+    (or whatever arrives within max_wait_ms of the first), runs one
+    model.predict per model in the batch and resolves each caller's Future
+    with its own slice of the predictions.
+    """
+
+    def __init__(self, columns, max_batch=64, max_wait_ms=2):
+        self.columns = list(columns)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._stats = {
+            'batches': 0,
+            'requests': 0,
+            'rows': 0,
+            'max_batch_rows': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'total_predict_ms': 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, model, rows):
+        """Queue feature rows (lists in `columns` order); returns a Future with their predictions"""
+        future = Future()
+        self._queue.put((model, rows, future, time.perf_counter()))
+        return future
+
+    def predict(self, model, rows):
+        return self.submit(model, rows).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        batches, requests = stats['batches'], stats['requests']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['avg_batch_rows'] = stats['rows'] / batches if batches else 0.0
+        stats['avg_added_latency_ms'] = stats.pop('total_wait_ms') / requests if requests else 0.0
+        stats['max_added_latency_ms'] = stats.pop('max_wait_ms')
+        stats['avg_predict_ms'] = stats['total_predict_ms'] / batches if batches else 0.0
+        stats['rows_per_second'] = stats['rows'] / (time.monotonic() - self._started_at)
+        del stats['total_predict_ms']
+        return stats
+
+    def _collect(self, first):
+        batch = [first]
+        rows = len(first[1])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            rows += len(item[1])
+        return batch
+
+    def _predict(self, batch):
+        started = time.perf_counter()
+        by_model = {}
+        for item in batch:
+            by_model.setdefault(id(item[0]), []).append(item)
+
+        for items in by_model.values():
+            model = items[0][0]
+            rows = [row for _, item_rows, _, _ in items for row in item_rows]
+            try:
+                predictions = model.predict(pd.DataFrame(rows, columns=self.columns))
+            except Exception as e:
+                for _, _, future, _ in items:
+                    future.set_exception(e)
+                continue
+            offsets = np.cumsum([0] + [len(item_rows) for _, item_rows, _, _ in items])
+            for (_, _, future, _), start, end in zip(items, offsets[:-1], offsets[1:]):
+                future.set_result(predictions[start:end])
+
+        predict_ms = (time.perf_counter() - started) * 1000
+        waits = [(started - submitted) * 1000 for _, _, _, submitted in batch]
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['requests'] += len(batch)
+            self._stats['rows'] += sum(len(item[1]) for item in batch)
+            self._stats['max_batch_rows'] = max(self._stats['max_batch_rows'], sum(len(item[1]) for item in batch))
+            self._stats['total_wait_ms'] += sum(waits)
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], max(waits))
+            self._stats['total_predict_ms'] += predict_ms
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._predict(self._collect(first))
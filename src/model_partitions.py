@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import time
+import pickle
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+PARTITIONS_DIR = os.environ.get('MODEL_PARTITIONS_DIR', 'inventory_model_parts')
+INDEX_FILE = 'index.json'
+# Categories with fewer training rows than this share one '_other' model
+MIN_PARTITION_ROWS = int(os.environ.get('MIN_PARTITION_ROWS', 200))
+OTHER = '_other'
+
+def index_path(partitions_dir=PARTITIONS_DIR):
+    return os.path.join(partitions_dir, INDEX_FILE)
+
+def partition_file(name):
+    return re.sub(r'[^A-Za-z0-9_]+', '_', name).strip('_').lower() + '.pkl'
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def assign_partitions(row_counts, min_rows=MIN_PARTITION_ROWS):
+    """Map each category to its partition name, folding small categories into OTHER"""
+    assignment = {category: category if count >= min_rows else OTHER for category, count in row_counts.items()}
+    if list(assignment.values()).count(OTHER) == len(assignment):
+        # Nothing is big enough on its own: one shared model
+        return {category: OTHER for category in assignment}
+    return assignment
+
+def fit_partition(name, frame, feature_columns, target_col, out_path):
+    """Worker: time-ordered 75/25 split, fit one partition model and save it; returns its metrics"""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.metrics import mean_absolute_error
+
+    start_time = time.time()
+    frame = frame.sort_values(by='SaleDate')
+    split_index = int(len(frame) * 0.75)
+    train_df, test_df = frame.iloc[:split_index], frame.iloc[split_index:]
+
+    model = GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=42)
+    model.fit(train_df[feature_columns], train_df[target_col])
+    test_mae = float(mean_absolute_error(test_df[target_col], model.predict(test_df[feature_columns]))) if len(test_df) else None
+
+    _write_atomic(out_path, lambda f: pickle.dump(model, f))
+    return {
+        'name': name,
+        'rows': len(frame),
+        'test_rows': len(test_df),
+        'test_mae': test_mae,
+        'seconds': round(time.time() - start_time, 2)
+    }
+
+def train_partitions(df_with_features, categories, feature_columns, partitions_dir=PARTITIONS_DIR,
+                     target_col='QuantitySold', workers=None, min_rows=MIN_PARTITION_ROWS):
+    """Fit one model per category in a process pool and write the routing index.
+
+    categories maps ProductID to Category. Every partition is written to its
+    own pickle; index.json is replaced last, so a reader never sees an index
+    pointing at a partition that is not there yet.
+    """
+    os.makedirs(partitions_dir, exist_ok=True)
+    product_category = df_with_features['ProductID'].map(categories).fillna(OTHER)
+    assignment = assign_partitions(product_category.value_counts().to_dict(), min_rows)
+    partition = product_category.map(assignment)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(fit_partition, name, frame, feature_columns, target_col,
+                        os.path.join(partitions_dir, partition_file(name)))
+            for name, frame in df_with_features.groupby(partition, sort=True)
+        ]
+        results = [future.result() for future in futures]
+
+    largest = max(results, key=lambda result: result['rows'])['name']
+    fallback = OTHER if any(result['name'] == OTHER for result in results) else largest
+    index = {
+        'partition_by': 'Category',
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'feature_columns': list(feature_columns),
+        'fallback': fallback,
+        'partitions': {result['name']: {**result, 'file': partition_file(result['name'])} for result in results},
+        # Categories without training rows have no partition of their own
+        'products': {str(product_id): assignment.get(category, fallback) for product_id, category in categories.items()}
+    }
+    _write_atomic(index_path(partitions_dir), lambda f: f.write(json.dumps(index, indent=2).encode('utf-8')))
+    return index
+
+class PartitionedModel:
+    """Drop-in for the single model: routes each row to its category's model by ProductID.
+
+    Only the index is read up front; a partition is unpickled the first time
+    a row routes to it, so a worker serving a few categories never holds the
+    rest in memory. Products missing from the index use the fallback model.
+    """
+
+    def __init__(self, partitions_dir=PARTITIONS_DIR):
+        self.partitions_dir = partitions_dir
+        with open(index_path(partitions_dir)) as f:
+            self.index = json.load(f)
+        self._routes = {int(product_id): name for product_id, name in self.index['products'].items()}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def route(self, product_id):
+        return self._routes.get(int(product_id), self.index['fallback'])
+
+    def partition(self, name):
+        if name not in self.index['partitions']:
+            name = self.index['fallback']
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    path = os.path.join(self.partitions_dir, self.index['partitions'][name]['file'])
+                    with open(path, 'rb') as f:
+                        model = self._models[name] = pickle.load(f)
+        return model
+
+    def predict(self, X):
+        names = np.array([self.route(product_id) for product_id in X['ProductID']])
+        predictions = np.zeros(len(X))
+        for name in np.unique(names):
+            mask = names == name
+            predictions[mask] = self.partition(name).predict(X[mask])
+        return predictions
+
+    def stats(self):
+        return {
+            'partition_by': self.index['partition_by'],
+            'trained_at': self.index['trained_at'],
+            'partitions': len(self.index['partitions']),
+            'loaded': sorted(self._models),
+            'products': len(self._routes)
+        }
+
+def load(path):
+    """A model from a single pickle or a partitions directory; None if it does not exist"""
+    try:
+        if os.path.isdir(path):
+            return PartitionedModel(path)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
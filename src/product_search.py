@@ -0,0 +1,105 @@
+import re
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Above this many matches, bm25 ranking is replaced by a cheap name-based order
+MAX_CANDIDATES = 2000
+# bm25 column weights: a hit in the name outranks category, which outranks supplier
+RANK = 'bm25(ProductSearch, 10.0, 3.0, 1.0)'
+
+def ensure_index(conn):
+    """Create the FTS5 product index, filling it from Products on first use"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ProductSearch'"
+    ).fetchone()
+    if exists:
+        return False
+    conn.execute('''
+        CREATE VIRTUAL TABLE ProductSearch USING fts5(
+            ProductName, Category, SupplierName,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3'
+        )
+    ''')
+    rebuild_index(conn)
+    return True
+
+def rebuild_index(conn):
+    conn.execute('DELETE FROM ProductSearch')
+    conn.execute('''
+        INSERT INTO ProductSearch (rowid, ProductName, Category, SupplierName)
+        SELECT p.ProductID, p.ProductName, p.Category, COALESCE(s.SupplierName, '')
+        FROM Products p
+        LEFT JOIN Suppliers s ON p.SupplierID = s.SupplierID
+    ''')
+    conn.commit()
+
+def index_product(cursor, product_id):
+    """(Re)index one product; call in the same transaction that writes Products"""
+    cursor.execute('DELETE FROM ProductSearch WHERE rowid = ?', (product_id,))
+    cursor.execute('''
+        INSERT INTO ProductSearch (rowid, ProductName, Category, SupplierName)
+        SELECT p.ProductID, p.ProductName, p.Category, COALESCE(s.SupplierName, '')
+        FROM Products p
+        LEFT JOIN Suppliers s ON p.SupplierID = s.SupplierID
+        WHERE p.ProductID = ?
+    ''', (product_id,))
+
+def match_expression(query):
+    """Turn free text into an FTS5 query where every word must match as a prefix"""
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+def _broad_rank(words, name):
+    """Cheap ordering for very broad queries: name starts with the query, then name hits, then shorter names"""
+    name_words = re.findall(r'\w+', name.lower())
+    starts = bool(name_words) and name_words[0].startswith(words[0])
+    name_hits = sum(any(w.startswith(word) for w in name_words) for word in words)
+    return (not starts, -name_hits, len(name))
+
+def search_products(conn, query, limit=DEFAULT_LIMIT):
+    """Best-ranked products whose name, category or supplier start with every query word.
+
+    Queries matching up to MAX_CANDIDATES products are ordered by bm25. For
+    broader prefixes (a single letter, a whole category) bm25 would have to
+    score every match, so the first MAX_CANDIDATES matches are ordered by a
+    cheap name-based rank instead.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    expression = match_expression(query)
+    if not expression:
+        return []
+
+    candidates = conn.execute(
+        'SELECT rowid, ProductName FROM ProductSearch WHERE ProductSearch MATCH ? LIMIT ?',
+        (expression, MAX_CANDIDATES + 1)
+    ).fetchall()
+    if len(candidates) <= MAX_CANDIDATES:
+        product_ids = [row[0] for row in conn.execute(
+            f'SELECT rowid FROM ProductSearch WHERE ProductSearch MATCH ? ORDER BY {RANK} LIMIT ?',
+            (expression, limit)
+        )]
+    else:
+        words = re.findall(r'\w+', query.lower())
+        candidates.sort(key=lambda row: _broad_rank(words, row[1]))
+        product_ids = [row[0] for row in candidates[:limit]]
+    if not product_ids:
+        return []
+
+    placeholders = ', '.join('?' for _ in product_ids)
+    rows = {row[0]: row for row in conn.execute(f'''
+        SELECT p.ProductID, p.ProductName, p.Category, p.UnitPrice, s.SupplierName, i.QuantityAvailable
+        FROM Products p
+        LEFT JOIN Suppliers s ON p.SupplierID = s.SupplierID
+        LEFT JOIN Inventory i ON i.ProductID = p.ProductID
+        WHERE p.ProductID IN ({placeholders})
+    ''', product_ids)}
+
+    return [{
+        'product_id': row[0],
+        'product_name': row[1],
+        'category': row[2],
+        'unit_price': row[3],
+        'supplier_name': row[4],
+        'quantity_available': row[5]
+    } for row in (rows.get(product_id) for product_id in product_ids) if row is not None]
@@ -0,0 +1,146 @@
+import os
+import sys
+import math
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from demand_matrix import DemandMatrix
+from forecasting import forecast_batch
+import model_partitions
+import day_keys
+
+SERVICE_LEVEL = float(os.environ.get('REORDER_SERVICE_LEVEL', 0.95))
+LEAD_TIME_DAYS = int(os.environ.get('REORDER_LEAD_TIME_DAYS', 7))
+HISTORY_DAYS = 90
+CHUNK_SIZE = 200
+
+_worker = {}
+
+def _init_worker(model_path):
+    _worker['model'] = model_partitions.load(model_path)
+
+def ensure_runs_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ReorderRuns (
+            RunID INTEGER PRIMARY KEY AUTOINCREMENT,
+            RunAt DATETIME,
+            ServiceLevel REAL,
+            LeadTimeDays INTEGER,
+            ProductsEvaluated INTEGER,
+            RowsChanged INTEGER,
+            DurationSeconds REAL
+        )
+    ''')
+
+def reorder_levels(lead_time_demand, daily_std, service_level, lead_time_days):
+    """Safety stock z * sigma * sqrt(L); reorder point is lead-time demand plus safety stock"""
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = max(0.0, z * daily_std * math.sqrt(lead_time_days))
+    return math.ceil(lead_time_demand + safety_stock), math.ceil(safety_stock)
+
+def optimize_chunk(db_path, product_ids, end_date, service_level, lead_time_days, history_days=HISTORY_DAYS):
+    """New (ProductID, ReorderPoint, MinimumStockLevel) for one chunk; runs in a worker process"""
+    start_day = day_keys.to_day(end_date) - (history_days - 1)
+    placeholders = ', '.join('?' for _ in product_ids)
+    conn = sqlite3.connect(db_path)
+    matrix = DemandMatrix.from_db(
+        conn, where=f'WHERE ProductID IN ({placeholders}) AND SaleDay >= ?', params=(*product_ids, start_day)
+    )
+    conn.close()
+    if len(matrix.product_ids) == 0:
+        return []
+    while matrix.end_date < pd.Timestamp(end_date):
+        matrix.append_day()
+
+    product_ids = [int(pid) for pid in matrix.product_ids]
+    histories = [matrix.recent_history(pid)[0] for pid in product_ids]
+    forecasts = forecast_batch(
+        _worker['model'], product_ids, histories, [matrix.end_date] * len(product_ids), lead_time_days
+    )
+
+    levels = []
+    for row, (product_id, forecast) in enumerate(zip(product_ids, forecasts)):
+        daily = matrix.quantities[row, matrix.first_day[row]:]
+        daily_std = float(np.std(daily, ddof=1)) if len(daily) > 1 else 0.0
+        reorder_point, minimum_stock = reorder_levels(sum(forecast), daily_std, service_level, lead_time_days)
+        levels.append((product_id, reorder_point, minimum_stock))
+    return levels
+
+def optimize_reorder_points(db_path='inventory.db', model_path='inventory_model.pkl', service_level=SERVICE_LEVEL,
+                            lead_time_days=LEAD_TIME_DAYS, workers=None, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Recompute ReorderPoint and MinimumStockLevel for every product with sales history.
+
+    Product chunks are forecast in a process pool; all changes are written
+    back with one executemany UPDATE and the run is logged in ReorderRuns.
+    """
+    start_time = time.time()
+    conn = sqlite3.connect(db_path)
+    day_keys.ensure_day_keys(conn)
+    product_ids = [row[0] for row in conn.execute('SELECT ProductID FROM Inventory ORDER BY ProductID')]
+    end_day = conn.execute('SELECT MAX(SaleDay) FROM Sales').fetchone()[0]
+    end_date = day_keys.from_day(end_day).isoformat() if end_day is not None else None
+    if not product_ids or end_date is None:
+        conn.close()
+        return {'products': 0, 'rows_changed': 0, 'levels': [], 'seconds': time.time() - start_time}
+
+    chunks = [product_ids[i:i + chunk_size] for i in range(0, len(product_ids), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        futures = [
+            pool.submit(optimize_chunk, db_path, chunk, end_date, service_level, lead_time_days)
+            for chunk in chunks
+        ]
+        levels = [level for future in futures for level in future.result()]
+
+    rows_changed = 0
+    if not dry_run:
+        cursor = conn.cursor()
+        cursor.executemany('''
+            UPDATE Inventory SET ReorderPoint = ?, MinimumStockLevel = ?
+            WHERE ProductID = ? AND (ReorderPoint IS NOT ? OR MinimumStockLevel IS NOT ?)
+        ''', [(rop, minimum, pid, rop, minimum) for pid, rop, minimum in levels])
+        rows_changed = cursor.rowcount
+
+        ensure_runs_table(conn)
+        seconds = time.time() - start_time
+        conn.execute('''
+            INSERT INTO ReorderRuns (RunAt, ServiceLevel, LeadTimeDays, ProductsEvaluated, RowsChanged, DurationSeconds)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (datetime.now(), service_level, lead_time_days, len(levels), rows_changed, seconds))
+        conn.commit()
+    conn.close()
+
+    return {'products': len(levels), 'rows_changed': rows_changed, 'levels': levels, 'seconds': time.time() - start_time}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recompute reorder points from forecast demand.')
+    parser.add_argument('--db', default='inventory.db')
+    parser.add_argument('--model', default='inventory_model.pkl', help='model pickle or partitions directory')
+    parser.add_argument('--service-level', type=float, default=SERVICE_LEVEL)
+    parser.add_argument('--lead-time-days', type=int, default=LEAD_TIME_DAYS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    for path in (args.db, args.model):
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}")
+            sys.exit(1)
+    if not 0.5 <= args.service_level < 1:
+        print("Error: --service-level must be between 0.5 and 1")
+        sys.exit(1)
+
+    result = optimize_reorder_points(
+        args.db, args.model, args.service_level, args.lead_time_days, args.workers, args.chunk_size, args.dry_run
+    )
+    for product_id, reorder_point, minimum_stock in result['levels']:
+        print(f"  Product {product_id}: reorder point {reorder_point}, minimum stock {minimum_stock}")
+    outcome = 'dry run, nothing written' if args.dry_run else f"{result['rows_changed']} rows changed"
+    print(f"✓ {result['products']} products evaluated, {outcome} ({result['seconds']:.2f}s)")
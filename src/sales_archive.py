@@ -0,0 +1,143 @@
+import os
+import sys
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+
+import day_keys
+
+HOT_DAYS = int(os.environ.get('SALES_HOT_DAYS', 365))
+SALES_COLUMNS = 'SaleID, ProductID, SaleDate, QuantitySold, TotalAmount'
+
+def archive_path(db_path='inventory.db'):
+    """Archive database that sits next to a store database"""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}_archive{ext or '.db'}"
+
+def partition_name(month_start):
+    return f"Sales_{month_start[:4]}_{month_start[5:7]}"
+
+def ensure_sales_indexes(conn):
+    """Indexes that let date filters on the hot table use range scans"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_date ON Sales(SaleDate)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sales_product_date ON Sales(ProductID, SaleDate)')
+
+def attach_archive(conn, db_path='inventory.db'):
+    """Attach the archive database as `archive`, creating its partition catalog if needed"""
+    attached = [row[1] for row in conn.execute('PRAGMA database_list')]
+    if 'archive' not in attached:
+        conn.execute('ATTACH DATABASE ? AS archive', (archive_path(db_path),))
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive.Partitions (
+            TableName TEXT PRIMARY KEY,
+            MonthStart DATE,
+            MonthEnd DATE,
+            RowCount INTEGER,
+            ArchivedAt DATETIME
+        )
+    ''')
+
+def archive_partitions(conn, since=None, until=None):
+    """Names of archive partitions overlapping [since, until); archive must be attached"""
+    query = 'SELECT TableName FROM archive.Partitions WHERE 1 = 1'
+    params = []
+    if since is not None:
+        query += ' AND MonthEnd > ?'
+        params.append(str(since))
+    if until is not None:
+        query += ' AND MonthStart < ?'
+        params.append(str(until))
+    return [row[0] for row in conn.execute(query + ' ORDER BY MonthStart', params)]
+
+def sales_source(conn, db_path='inventory.db', include_archive=False, since=None):
+    """FROM-clause source for sales: the hot table, plus only the archive months needed.
+
+    Returns a table name or a parenthesised UNION ALL subquery, so callers can
+    write `FROM {source} AS s` wherever they would write `FROM Sales s`.
+    """
+    if not include_archive or not os.path.exists(archive_path(db_path)):
+        return 'Sales'
+    attach_archive(conn, db_path)
+    partitions = archive_partitions(conn, since=since)
+    if not partitions:
+        return 'Sales'
+    # Archive partitions predate day keys, so their SaleDay is derived on the fly
+    selects = [f"SELECT {SALES_COLUMNS}, SaleDay FROM Sales"]
+    selects += [f"SELECT {SALES_COLUMNS}, {day_keys.day_sql()} AS SaleDay FROM archive.{name}" for name in partitions]
+    return f"({' UNION ALL '.join(selects)})"
+
+def archive_sales(db_path='inventory.db', hot_days=HOT_DAYS, now=None):
+    """Move sales older than hot_days into monthly tables of the archive database.
+
+    Each month is copied and deleted in one transaction spanning both files, and
+    the copied row count is checked against the source before committing.
+    """
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=hot_days)).date().isoformat()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    ensure_sales_indexes(conn)
+    attach_archive(conn, db_path)
+
+    months = [row[0] for row in conn.execute(
+        "SELECT DISTINCT strftime('%Y-%m-01', SaleDate) FROM Sales WHERE SaleDate < ? ORDER BY 1",
+        (cutoff,)
+    )]
+
+    moved = {}
+    for month_start in months:
+        table = partition_name(month_start)
+        month_end = conn.execute("SELECT date(?, '+1 month')", (month_start,)).fetchone()[0]
+        upper = min(month_end, cutoff)
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS archive.{table} (
+                    SaleID INTEGER PRIMARY KEY,
+                    ProductID INTEGER,
+                    SaleDate DATE,
+                    QuantitySold INTEGER,
+                    TotalAmount REAL
+                )
+            ''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS archive.idx_{table}_product_date ON {table}(ProductID, SaleDate)')
+            expected = conn.execute(
+                'SELECT COUNT(*) FROM Sales WHERE SaleDate >= ? AND SaleDate < ?', (month_start, upper)
+            ).fetchone()[0]
+            copied = conn.execute(f'''
+                INSERT INTO archive.{table} ({SALES_COLUMNS})
+                SELECT {SALES_COLUMNS} FROM Sales WHERE SaleDate >= ? AND SaleDate < ?
+            ''', (month_start, upper)).rowcount
+            if copied != expected:
+                raise RuntimeError(f"{table}: copied {copied} rows, expected {expected}")
+            conn.execute('DELETE FROM Sales WHERE SaleDate >= ? AND SaleDate < ?', (month_start, upper))
+            conn.execute('''
+                INSERT INTO archive.Partitions (TableName, MonthStart, MonthEnd, RowCount, ArchivedAt)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(TableName) DO UPDATE SET RowCount = RowCount + excluded.RowCount, ArchivedAt = excluded.ArchivedAt
+            ''', (table, month_start, month_end, copied, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            conn.close()
+            raise
+        moved[table] = copied
+
+    conn.close()
+    return moved
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move old sales into monthly archive partitions.')
+    parser.add_argument('--db', default='inventory.db')
+    parser.add_argument('--hot-days', type=int, default=HOT_DAYS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: File not found: {args.db}")
+        sys.exit(1)
+
+    moved = archive_sales(args.db, args.hot_days)
+    for table, count in moved.items():
+        print(f"  {table}: {count} rows archived")
+    print(f"✓ Archived {sum(moved.values())} sales older than {args.hot_days} days into {archive_path(args.db)}")
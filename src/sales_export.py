@@ -0,0 +1,85 @@
+import io
+import csv
+import json
+import zlib
+import sqlite3
+
+import sales_archive
+import day_keys
+
+EXPORT_COLUMNS = ['sale_id', 'sale_date', 'product_id', 'product_name', 'category', 'quantity_sold', 'total_amount']
+CHUNK_SIZE = 5000
+
+def iter_sales_chunks(db_path, start_date=None, end_date=None, product_ids=None, include_archive=False,
+                      chunk_size=CHUNK_SIZE):
+    """Yield lists of sale rows (EXPORT_COLUMNS order) straight from a cursor, chunk_size at a time.
+
+    The connection lives as long as the generator, so pass db_path rather
+    than anything tied to the request.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        source = sales_archive.sales_source(conn, db_path, include_archive, since=start_date)
+        conditions, params = [], []
+        if start_date:
+            conditions.append('s.SaleDay >= ?')
+            params.append(day_keys.to_day(start_date))
+        if end_date:
+            conditions.append('s.SaleDay <= ?')
+            params.append(day_keys.to_day(end_date))
+        if product_ids:
+            conditions.append(f"s.ProductID IN ({', '.join('?' for _ in product_ids)})")
+            params.extend(product_ids)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        cursor = conn.execute(f'''
+            SELECT s.SaleID, s.SaleDate, s.ProductID, p.ProductName, p.Category, s.QuantitySold, s.TotalAmount
+            FROM {source} AS s
+            LEFT JOIN Products p ON s.ProductID = p.ProductID
+            {where}
+            ORDER BY s.SaleDay, s.SaleID
+        ''', params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+def csv_stream(chunks):
+    """CSV text: a header, then one string per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def ndjson_stream(chunks):
+    """One JSON object per line, one string per chunk"""
+    for rows in chunks:
+        yield ''.join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n' for row in rows)
+
+def encode_stream(texts, compress=False):
+    """UTF-8 encode a text stream, gzip-compressing it on the fly when asked"""
+    if not compress:
+        for text in texts:
+            yield text.encode('utf-8')
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for text in texts:
+        data = compressor.compress(text.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+FORMATS = {
+    'csv': (csv_stream, 'text/csv'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson')
+}
@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import struct
+import sqlite3
+from datetime import date, timedelta
+import numpy as np
+
+import day_keys
+
+SNAPSHOT_MAGIC = b'SALESNAP'
+HEADER = struct.Struct('<8sQQQ')
+EPOCH = date(1970, 1, 1)
+
+def _layout(product_count, value_count):
+    """Byte offsets of each array in the snapshot file"""
+    ids_offset = HEADER.size
+    offsets_offset = ids_offset + product_count * 8
+    days_offset = offsets_offset + (product_count + 1) * 8
+    quantities_offset = days_offset + value_count * 4
+    end = quantities_offset + value_count * 4
+    return ids_offset, offsets_offset, days_offset, quantities_offset, end
+
+def read_version(path):
+    """Read only the version field from a snapshot header"""
+    with open(path, 'rb') as f:
+        magic, version, _, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a sales snapshot")
+    return version
+
+def export_snapshot(db_path='inventory.db', path='sales_snapshot.bin'):
+    """Write per-product daily quantity series to a memory-mappable file.
+
+    The file is written next to the target and swapped in with os.replace, so
+    readers either see the old snapshot or the complete new one.
+    """
+    conn = sqlite3.connect(db_path)
+    day_keys.ensure_day_keys(conn)
+    rows = conn.execute('''
+        SELECT ProductID, SaleDay, SUM(QuantitySold)
+        FROM Sales
+        WHERE SaleDay <= ?
+        GROUP BY ProductID, SaleDay
+        ORDER BY ProductID, SaleDay
+    ''', (day_keys.today(),)).fetchall()
+    conn.close()
+
+    data = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    product_ids, starts = np.unique(data[:, 0], return_index=True)
+    offsets = np.append(starts, len(data)).astype(np.int64)
+    version = time.time_ns()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, version, len(product_ids), len(data)))
+        f.write(product_ids.astype(np.int64).tobytes())
+        f.write(offsets.tobytes())
+        f.write(data[:, 1].astype(np.int32).tobytes())
+        f.write(data[:, 2].astype(np.int32).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    return version, len(product_ids), len(data)
+
+class SalesSnapshot:
+    """Read-only, zero-copy view of an exported sales snapshot.
+
+    Every worker maps the same file, so the pages live once in the OS page
+    cache. The header version is re-checked at most every check_interval
+    seconds and the file is remapped when the exporter has swapped it.
+    """
+
+    def __init__(self, path='sales_snapshot.bin', check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+        self._map()
+
+    def _map(self):
+        buffer = np.memmap(self.path, dtype=np.uint8, mode='r')
+        magic, version, product_count, value_count = HEADER.unpack(bytes(buffer[:HEADER.size]))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.path} is not a sales snapshot")
+
+        ids_offset, offsets_offset, days_offset, quantities_offset, _ = _layout(product_count, value_count)
+        days = np.frombuffer(buffer, dtype=np.int32, count=value_count, offset=days_offset)
+        # Request threads read the view while another thread remaps, so every
+        # array of one file version is swapped in by a single assignment
+        self._view = (
+            version,
+            np.frombuffer(buffer, dtype=np.int64, count=product_count, offset=ids_offset),
+            np.frombuffer(buffer, dtype=np.int64, count=product_count + 1, offset=offsets_offset),
+            days,
+            np.frombuffer(buffer, dtype=np.int32, count=value_count, offset=quantities_offset),
+            int(days.max()) if value_count else 0
+        )
+        self._checked_at = time.monotonic()
+
+    @property
+    def version(self):
+        return self._view[0]
+
+    def refresh(self):
+        """Remap the file if the exporter published a new version"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        if read_version(self.path) == self.version:
+            return False
+        self._map()
+        return True
+
+    def _series(self, product_id):
+        """(days, quantities, end_day) of a product from one consistent view, or None"""
+        self.refresh()
+        _, product_ids, offsets, days, quantities, end_day = self._view
+        index = np.searchsorted(product_ids, product_id)
+        if index >= len(product_ids) or product_ids[index] != product_id:
+            return None
+        rows = slice(offsets[index], offsets[index + 1])
+        return days[rows], quantities[rows], end_day
+
+    def series(self, product_id):
+        """Return (days, quantities) views for a product, or None"""
+        result = self._series(product_id)
+        if result is None:
+            return None
+        return result[0], result[1]
+
+    def recent_history(self, product_id, window=30):
+        """Last `window` days of quantities (zeros for days without sales) and the end date"""
+        result = self._series(product_id)
+        if result is None or len(result[0]) == 0:
+            return [], None
+        days, quantities, end_day = result
+        first_day = max(end_day - window + 1, int(days[0]))
+        recent = np.zeros(end_day - first_day + 1, dtype=np.int64)
+        keep = days >= first_day
+        recent[days[keep] - first_day] = quantities[keep]
+        return recent.tolist(), EPOCH + timedelta(days=end_day)
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'sales_snapshot.bin'
+    start_time = time.time()
+    version, product_count, value_count = export_snapshot(path=path)
+    print(f"✓ Snapshot {version} written to {path}: {product_count} products, {value_count} days ({time.time() - start_time:.2f}s)")
@@ -0,0 +1,181 @@
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer
+
+import app as inventory_app
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server that handles requests on a fixed-size thread pool"""
+
+    multithread = True
+
+    def __init__(self, host, port, wsgi_app, threads, fd=None):
+        super().__init__(host, port, wsgi_app, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self, 'pool'):
+            self.pool.shutdown(wait=True)
+
+def run_worker(listen_fd, host, port, threads):
+    """Serve on the inherited socket until SIGTERM, then drain in-flight requests"""
+    server = PooledWSGIServer(host, port, inventory_app.app, threads, fd=listen_fd)
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so it must not run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server.serve_forever()
+    server.server_close()
+    os._exit(0)
+
+class Master:
+    """Pre-forking master: preloads the model, forks workers and reloads on SIGHUP"""
+
+    def __init__(self, host, port, workers, threads):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.children = set()
+        self.reload_requested = False
+        self.stop_requested = False
+
+    def bind(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(BaseWSGIServer.request_queue_size)
+        sock.set_inheritable(True)
+        self.sock = sock
+
+    def preload(self):
+        start_time = time.time()
+        ready = inventory_app.preload()
+        # Keep the preloaded objects out of the cyclic GC so collections in the
+        # workers don't touch (and un-share) their pages.
+        gc.collect()
+        gc.freeze()
+        status = "model loaded" if ready else "no model found"
+        print(f"[master {os.getpid()}] Preloaded in {time.time() - start_time:.2f}s ({status})")
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.sock.fileno(), self.host, self.port, self.threads)
+        self.children.add(pid)
+        return pid
+
+    def spawn_all(self):
+        return {self.spawn() for _ in range(self.workers)}
+
+    def stop_children(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited workers; returns pids that exited"""
+        exited = set()
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            exited.add(pid)
+        return exited
+
+    def reload(self):
+        """Load the new model in the master, start fresh workers, then drain the old ones"""
+        old_children = set(self.children)
+        gc.unfreeze()
+        self.preload()
+        self.children -= old_children
+        self.spawn_all()
+        self.stop_children(old_children)
+        print(f"[master {os.getpid()}] Reloaded: {len(old_children)} old workers draining")
+        return old_children
+
+    def run(self):
+        self.bind()
+        self.preload()
+        self.spawn_all()
+        print(f"[master {os.getpid()}] Serving on http://{self.host}:{self.port} "
+              f"with {self.workers} workers x {self.threads} threads")
+
+        signal.signal(signal.SIGHUP, lambda signum, frame: setattr(self, 'reload_requested', True))
+        signal.signal(signal.SIGTERM, lambda signum, frame: setattr(self, 'stop_requested', True))
+        signal.signal(signal.SIGINT, lambda signum, frame: setattr(self, 'stop_requested', True))
+
+        draining = set()
+        while not self.stop_requested:
+            time.sleep(0.5)
+
+            if self.reload_requested:
+                self.reload_requested = False
+                draining |= self.reload()
+
+            for pid in self.reap():
+                if pid in draining:
+                    draining.discard(pid)
+                elif pid in self.children and not self.stop_requested:
+                    self.children.discard(pid)
+                    print(f"[master {os.getpid()}] Worker {pid} exited unexpectedly, respawning")
+                    self.spawn()
+
+        self.stop_children(self.children | draining)
+        for pid in list(self.children | draining):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.sock.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the inventory app with pre-forked workers.')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVE_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SERVE_THREADS', 4)))
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if not hasattr(os, 'fork'):
+        # No fork() (Windows): one process, thread pool only
+        inventory_app.preload()
+        server = PooledWSGIServer(args.host, args.port, inventory_app.app, args.threads)
+        print(f"Serving on http://{args.host}:{args.port} with {args.threads} threads (single process)")
+        server.serve_forever()
+        sys.exit(0)
+
+    Master(args.host, args.port, args.workers, args.threads).run()
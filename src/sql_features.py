@@ -0,0 +1,138 @@
+import sys
+import sqlite3
+import numpy as np
+import pandas as pd
+
+import day_keys
+from demand_matrix import DemandMatrix, FEATURE_COLUMNS
+
+# Same 11 features as DemandMatrix.training_frame(), computed by SQLite window
+# functions over a dense daily series: every product has one row per day from
+# its first sale to the last sale day up to today, with zeros on days without
+# sales, so LAG and ROWS frames count days. Lags before the first sale fall
+# back to the first day's quantity, like the matrix does. Calendar features
+# come from the precomputed Calendar table.
+FEATURES_SQL = '''
+    WITH daily AS (
+        SELECT ProductID, SaleDay, SUM(QuantitySold) AS QuantitySold
+        FROM Sales
+        WHERE SaleDay <= {today} {where}
+        GROUP BY ProductID, SaleDay
+    ),
+    spans AS (
+        SELECT ProductID, MIN(SaleDay) AS FirstDay FROM daily GROUP BY ProductID
+    ),
+    dense AS (
+        SELECT s.ProductID, c.Day AS SaleDay, COALESCE(d.QuantitySold, 0) AS QuantitySold,
+               c.DayOfWeek, c.Month, c.WeekOfYear, c.DayOfMonth, c.Quarter
+        FROM spans s
+        JOIN Calendar c ON c.Day BETWEEN s.FirstDay AND (SELECT MAX(SaleDay) FROM Sales WHERE SaleDay <= {today})
+        LEFT JOIN daily d ON d.ProductID = s.ProductID AND d.SaleDay = c.Day
+    )
+    SELECT
+        ProductID,
+        SaleDay,
+        QuantitySold,
+        DayOfWeek,
+        Month,
+        WeekOfYear,
+        DayOfMonth,
+        Quarter,
+        COALESCE(LAG(QuantitySold, 7) OVER w, FIRST_VALUE(QuantitySold) OVER w) AS Sales_Lag_7,
+        COALESCE(LAG(QuantitySold, 14) OVER w, FIRST_VALUE(QuantitySold) OVER w) AS Sales_Lag_14,
+        COALESCE(LAG(QuantitySold, 30) OVER w, FIRST_VALUE(QuantitySold) OVER w) AS Sales_Lag_30,
+        AVG(QuantitySold) OVER (w ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) AS Sales_Rolling_7,
+        AVG(QuantitySold) OVER (w ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS Sales_Rolling_30,
+        ROW_NUMBER() OVER (PARTITION BY ProductID ORDER BY SaleDay DESC) AS DaysFromEnd
+    FROM dense
+    WINDOW w AS (PARTITION BY ProductID ORDER BY SaleDay)
+'''
+
+OUTPUT_COLUMNS = ['SaleDate', 'QuantitySold'] + FEATURE_COLUMNS
+QUERY_COLUMNS = ['SaleDay', 'QuantitySold'] + FEATURE_COLUMNS
+
+def _select(where=''):
+    return f"SELECT {', '.join(QUERY_COLUMNS)} FROM ({FEATURES_SQL.format(where=where, today=day_keys.today())})"
+
+def _to_output(df):
+    """Turn the SaleDay column into a SaleDate timestamp without parsing any strings"""
+    df['SaleDay'] = pd.to_datetime(df['SaleDay'], unit='D')
+    return df.rename(columns={'SaleDay': 'SaleDate'})[OUTPUT_COLUMNS]
+
+def latest_features(conn, product_ids=None):
+    """Feature row for the last day of each product (or the given ones)"""
+    where = ''
+    params = []
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        where = f"AND ProductID IN ({', '.join('?' * len(product_ids))})"
+        params = product_ids
+    query = f"{_select(where)} WHERE DaysFromEnd = 1 ORDER BY ProductID"
+    return _to_output(pd.read_sql_query(query, conn, params=params))
+
+def recent_history(conn, product_id, window=30):
+    """Last `window` daily quantities of a product (zeros included) and the last sale day in the table.
+
+    Matches DemandMatrix.recent_history: the series ends on the latest sale
+    day of any product and starts no earlier than this product's first sale.
+    """
+    today = day_keys.today()
+    last_day = conn.execute('SELECT MAX(SaleDay) FROM Sales WHERE SaleDay <= ?', (today,)).fetchone()[0]
+    first_day = conn.execute(
+        'SELECT MIN(SaleDay) FROM Sales WHERE ProductID = ? AND SaleDay <= ?', (product_id, today)
+    ).fetchone()[0]
+    if first_day is None:
+        return [], None
+    start_day = max(last_day - window + 1, first_day)
+    quantities = [0] * (last_day - start_day + 1)
+    for sale_day, quantity in conn.execute('''
+        SELECT SaleDay, SUM(QuantitySold)
+        FROM Sales
+        WHERE ProductID = ? AND SaleDay BETWEEN ? AND ?
+        GROUP BY SaleDay
+    ''', (product_id, start_day, last_day)):
+        quantities[sale_day - start_day] = quantity
+    return quantities, pd.Timestamp(day_keys.from_day(last_day))
+
+def iter_training_rows(conn, batch_size=10000):
+    """Stream feature rows in day order as DataFrame chunks of batch_size"""
+    cursor = conn.execute(f"{_select()} ORDER BY SaleDay, ProductID")
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield _to_output(pd.DataFrame(rows, columns=QUERY_COLUMNS))
+
+def check_parity(db_path='inventory.db', tolerance=1e-9):
+    """Compare SQL features and recent histories with the DemandMatrix training path"""
+    conn = sqlite3.connect(db_path)
+    day_keys.ensure_day_keys(conn)
+    matrix = DemandMatrix.from_db(conn)
+    expected = matrix.training_frame()
+    actual = pd.concat(iter_training_rows(conn), ignore_index=True)
+
+    histories_match = all(
+        recent_history(conn, product_id) == matrix.recent_history(product_id)
+        for product_id in matrix.product_ids.tolist()
+    )
+    conn.close()
+
+    expected = expected.sort_values(['ProductID', 'SaleDate']).reset_index(drop=True)
+    actual = actual.sort_values(['ProductID', 'SaleDate']).reset_index(drop=True)
+    if len(expected) != len(actual) or not (expected['SaleDate'] == actual['SaleDate']).all():
+        print(f"✗ Row mismatch: DemandMatrix has {len(expected)} rows, SQL has {len(actual)}")
+        return False
+
+    print(f"Comparing {len(actual)} product-days across {len(matrix.product_ids)} products")
+    mismatched = []
+    for col in ['QuantitySold'] + FEATURE_COLUMNS:
+        diff = np.abs(expected[col].astype(float).values - actual[col].astype(float).values).max()
+        status = "✓" if diff <= tolerance else "✗"
+        print(f"  {status} {col:<18} max |diff| = {diff:.2e}")
+        if diff > tolerance:
+            mismatched.append(col)
+    print(f"  {'✓' if histories_match else '✗'} recent_history matches DemandMatrix.recent_history")
+    return not mismatched and histories_match
+
+if __name__ == '__main__':
+    sys.exit(0 if check_parity() else 1)
@@ -0,0 +1,99 @@
+import os
+import warnings
+import numpy as np
+
+from demand_matrix import FEATURE_COLUMNS
+
+MAX_CHUNK_MB = float(os.environ.get('SIM_MAX_CHUNK_MB', 64))
+
+def split_residuals(model, df_with_features, test_size=0.25):
+    """Actual minus predicted demand per product on the time-ordered hold-out split.
+
+    Uses the same 75/25 split as fit_and_save() and evaluate.py, so the
+    residuals are errors the model made on days it was not trained on.
+    """
+    df = df_with_features.sort_values(by='SaleDate')
+    test_df = df.iloc[int(len(df) * (1 - test_size)):]
+    if len(test_df) == 0:
+        return {}, np.zeros(1)
+
+    residuals = test_df['QuantitySold'].to_numpy(dtype=np.float64) - model.predict(test_df[FEATURE_COLUMNS])
+    product_ids = test_df['ProductID'].to_numpy()
+    by_product = {int(pid): residuals[product_ids == pid] for pid in np.unique(product_ids)}
+    return by_product, residuals
+
+def residual_table(product_ids, by_product, pooled):
+    """Padded (products x max_len) residual array plus the usable length of each row.
+
+    Products with no hold-out rows fall back to the pooled residuals.
+    """
+    pools = [by_product.get(int(pid), pooled) for pid in product_ids]
+    pools = [pool if len(pool) else pooled for pool in pools]
+    lengths = np.array([len(pool) for pool in pools], dtype=np.int64)
+    table = np.zeros((len(pools), lengths.max() if len(pools) else 1), dtype=np.float32)
+    for row, pool in enumerate(pools):
+        table[row, :len(pool)] = pool
+    return table, lengths
+
+def chunk_size(n_paths, n_days, max_chunk_mb=MAX_CHUNK_MB):
+    """Products per chunk so one float32 (chunk x paths x days) array stays under max_chunk_mb"""
+    bytes_per_product = n_paths * n_days * 4
+    return max(1, int(max_chunk_mb * 1024 * 1024 // bytes_per_product))
+
+def simulate_chunk(forecasts, residuals, lengths, on_hand, incoming, n_paths, rng):
+    """Simulate one chunk of products; every array is (chunk x paths x days).
+
+    Demand on each path is the point forecast plus residuals resampled from the
+    product's own hold-out errors, floored at zero. With lost sales, the units
+    short by day t equal max(0, max over s <= t of cumulative demand minus
+    cumulative supply), so no per-day loop is needed.
+    """
+    n_products, n_days = forecasts.shape
+    draws = (rng.random((n_products, n_paths, n_days), dtype=np.float32) * lengths[:, None, None]).astype(np.int32)
+    demand = forecasts[:, None, :] + residuals[np.arange(n_products)[:, None, None], draws]
+    np.maximum(demand, 0, out=demand)
+
+    supply = on_hand[:, None] + np.cumsum(incoming, axis=1)
+    deficit = np.cumsum(demand, axis=2) - supply[:, None, :]
+    shortfall = np.maximum(deficit.max(axis=2), 0)
+    stocked_out = deficit > 0
+    first_stockout = np.where(stocked_out.any(axis=2), stocked_out.argmax(axis=2) + 1, 0)
+    total_demand = demand.sum(axis=2)
+
+    stockout_days = np.where(first_stockout > 0, first_stockout, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median_days = np.nanmedian(stockout_days, axis=1)
+
+    stats = zip(
+        (shortfall > 0).mean(axis=1), shortfall.mean(axis=1),
+        total_demand.mean(axis=1), np.percentile(total_demand, 95, axis=1), median_days
+    )
+    return [{
+        'stockout_probability': round(float(probability), 4),
+        'expected_shortfall': round(float(expected_shortfall), 2),
+        'expected_demand': round(float(expected_demand), 2),
+        'demand_p95': round(float(p95), 2),
+        'median_days_to_stockout': None if np.isnan(days) else int(days)
+    } for probability, expected_shortfall, expected_demand, p95, days in stats]
+
+def simulate_stockouts(forecasts, residuals, lengths, on_hand, incoming, n_paths=2000, seed=None,
+                       max_chunk_mb=MAX_CHUNK_MB):
+    """Stockout risk for every product, processed in memory-bounded product chunks.
+
+    forecasts and incoming are (products x days), residuals/lengths come from
+    residual_table() and on_hand is the current stock per product.
+    """
+    forecasts = np.asarray(forecasts, dtype=np.float32)
+    incoming = np.asarray(incoming, dtype=np.float32)
+    on_hand = np.asarray(on_hand, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    step = chunk_size(n_paths, forecasts.shape[1], max_chunk_mb)
+
+    results = []
+    for start in range(0, len(forecasts), step):
+        chunk = slice(start, start + step)
+        results.extend(simulate_chunk(
+            forecasts[chunk], residuals[chunk], lengths[chunk], on_hand[chunk], incoming[chunk], n_paths, rng
+        ))
+    return results
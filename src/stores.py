@@ -0,0 +1,79 @@
+import os
+import re
+import glob
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DB = 'inventory.db'
+STORES_DIR = os.environ.get('STORES_DIR', 'stores')
+FAN_OUT_WORKERS = int(os.environ.get('STORE_FAN_OUT_WORKERS', 8))
+ALL_STORES = 'all'
+
+_STORE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+_executor = {'pool': None, 'pid': None}
+_executor_lock = threading.Lock()
+
+def db_path(store_id=None):
+    """SQLite file for a store; no store_id means the original inventory.db"""
+    if store_id is None or store_id == '':
+        return DEFAULT_DB
+    store_id = str(store_id)
+    if not _STORE_ID_PATTERN.match(store_id):
+        raise ValueError(f"Invalid store_id: {store_id}")
+    return os.path.join(STORES_DIR, f"store_{store_id}.db")
+
+def store_exists(store_id=None):
+    return os.path.exists(db_path(store_id))
+
+def list_store_ids():
+    """All sharded store ids found in STORES_DIR"""
+    paths = glob.glob(os.path.join(STORES_DIR, 'store_*.db'))
+    return sorted(os.path.basename(path)[len('store_'):-len('.db')] for path in paths)
+
+def all_store_ids():
+    """Every store: None for inventory.db (if present) followed by the shards"""
+    store_ids = list_store_ids()
+    if os.path.exists(DEFAULT_DB):
+        store_ids.insert(0, None)
+    return store_ids
+
+def create_store(store_id, with_sample_data=False, days=180):
+    """Create a store shard with the standard schema from db_setup"""
+    import db_setup
+
+    os.makedirs(STORES_DIR, exist_ok=True)
+    conn, cursor = db_setup.create_database(db_path(store_id))
+    if with_sample_data:
+        db_setup.insert_sample_data(conn, cursor)
+        db_setup.generate_sales_data(conn, cursor, days=days)
+    conn.close()
+    return db_path(store_id)
+
+def connect(store_id=None):
+    if not store_exists(store_id):
+        raise LookupError(f"Unknown store: {store_id}")
+    conn = sqlite3.connect(db_path(store_id))
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def _pool():
+    # Threads do not survive fork(), so each worker process builds its own pool
+    with _executor_lock:
+        if _executor['pid'] != os.getpid():
+            _executor['pool'] = ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS, thread_name_prefix='store-fan-out')
+            _executor['pid'] = os.getpid()
+        return _executor['pool']
+
+def fan_out(fn, store_ids=None):
+    """Run fn(conn) against every store in parallel; returns [(store_id, result)]"""
+    store_ids = all_store_ids() if store_ids is None else list(store_ids)
+
+    def run(store_id):
+        conn = connect(store_id)
+        try:
+            return fn(conn)
+        finally:
+            conn.close()
+
+    return list(zip(store_ids, _pool().map(run, store_ids)))
@@ -3,7 +3,13 @@ import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import pickle
+import sqlite3
+import copy
 import os
+from datetime import datetime
+from demand_matrix import DemandMatrix, FEATURE_COLUMNS
+import db_snapshot
+import day_keys
 
 def download_kaggle_dataset():
     """Download dataset from Kaggle using API."""
@@ -83,32 +89,19 @@ def train_model_on_kaggle_data(csv_path=None):
     # Convert date column
     df_renamed['SaleDate'] = pd.to_datetime(df_renamed['SaleDate'])
     
-    df_with_features = df_renamed.copy()
-    
-    df_with_features['DayOfWeek'] = df_with_features['SaleDate'].dt.dayofweek
-    df_with_features['Month'] = df_with_features['SaleDate'].dt.month
-    df_with_features['WeekOfYear'] = df_with_features['SaleDate'].dt.isocalendar().week
-    df_with_features['DayOfMonth'] = df_with_features['SaleDate'].dt.day
-    df_with_features['Quarter'] = df_with_features['SaleDate'].dt.quarter
-    
-    # Create lag and rolling features per product
-    product_dfs = []
-    for product_id in df_with_features['ProductID'].unique():
-        product_df = df_with_features[df_with_features['ProductID'] == product_id].copy()
-        product_df = product_df.sort_values(by='SaleDate')
-        
-        product_df['Sales_Lag_7'] = product_df['Quantity'].shift(7)
-        product_df['Sales_Lag_14'] = product_df['Quantity'].shift(14)
-        product_df['Sales_Lag_30'] = product_df['Quantity'].shift(30)
-        
-        product_df['Sales_Rolling_7'] = product_df['Quantity'].rolling(window=7, min_periods=1).mean()
-        product_df['Sales_Rolling_30'] = product_df['Quantity'].rolling(window=30, min_periods=1).mean()
-        
-        product_dfs.append(product_df)
-    
-    df_with_features = pd.concat(product_dfs, ignore_index=True)
-    df_with_features = df_with_features.bfill().fillna(0)
+    # Dense product x day matrix: lags and rolling windows count days, not rows
+    matrix = DemandMatrix.from_sales(df_renamed, quantity_col='Quantity')
+    df_with_features = matrix.training_frame().rename(columns={'QuantitySold': 'Quantity'})
     
+    return fit_and_save(df_with_features, target_col='Quantity')
+
+def fit_and_save(df_with_features, target_col='QuantitySold', watermarks=()):
+    """Time-ordered 75/25 split, fit the ensemble, report and save it.
+
+    watermarks lists (db_path, last_sale_id) for the databases the rows came
+    from; each gets a TrainingRuns row once the model is saved, so the next
+    --retrain starts after those sales.
+    """
     # Train/test split
     df_with_features = df_with_features.sort_values(by='SaleDate')
     split_index = int(len(df_with_features) * 0.75)
@@ -116,16 +109,10 @@ def train_model_on_kaggle_data(csv_path=None):
     train_df = df_with_features.iloc[:split_index]
     test_df = df_with_features.iloc[split_index:]
     
-    feature_columns = [
-        'ProductID', 'DayOfWeek', 'Month', 'WeekOfYear', 'DayOfMonth', 'Quarter',
-        'Sales_Lag_7', 'Sales_Lag_14', 'Sales_Lag_30',
-        'Sales_Rolling_7', 'Sales_Rolling_30'
-    ]
-    
-    X_train = train_df[feature_columns]
-    y_train = train_df['Quantity']
-    X_test = test_df[feature_columns]
-    y_test = test_df['Quantity']
+    X_train = train_df[FEATURE_COLUMNS]
+    y_train = train_df[target_col]
+    X_test = test_df[FEATURE_COLUMNS]
+    y_test = test_df[target_col]
     
     model = GradientBoostingRegressor(
         n_estimators=100,
@@ -150,18 +137,246 @@ def train_model_on_kaggle_data(csv_path=None):
     
     print(f"Test Performance: R²={test_r2:.4f}, MAE={test_mae:.2f} units")
     
-    with open('inventory_model.pkl', 'wb') as f:
-        pickle.dump(model, f)
+    save_model(model)
+    for db_path, last_sale_id in watermarks:
+        record_training_run(db_path, 'inventory_model.pkl', last_sale_id, len(X_train), test_mae)
     
     if test_r2 > 0.75:
         print(f"✓ Model ready (R² = {test_r2:.4f})")
     
     return True
 
+def load_all_stores_training_frame(include_archive=False):
+    """Build feature rows from every store database in parallel.
+
+    Each store gets its own demand matrix, since ProductIDs are only unique
+    within a store, read from a point-in-time snapshot of that store.
+    Archived sales are only read when include_archive is set. Returns the
+    frame and the (db_path, highest SaleID) of every store read.
+    """
+    import stores
+    import sales_archive
+    
+    def store_frame(conn):
+        db_path = conn.execute('PRAGMA database_list').fetchone()[2]
+        info = db_snapshot.create_snapshot(db_path)
+        snapshot_conn = sqlite3.connect(info['path'])
+        try:
+            source = sales_archive.sales_source(snapshot_conn, info['path'], include_archive)
+            return DemandMatrix.from_db(snapshot_conn, source=source).training_frame(), (db_path, info['max_sale_id'])
+        finally:
+            snapshot_conn.close()
+            db_snapshot.remove_snapshot(info['path'])
+    
+    frames = []
+    watermarks = []
+    for store_id, (frame, watermark) in stores.fan_out(store_frame):
+        frame['StoreID'] = store_id or ''
+        frames.append(frame)
+        watermarks.append(watermark)
+        print(f"  Store {store_id or 'default'}: {len(frame)} samples")
+    
+    if not frames:
+        return None, []
+    return pd.concat(frames, ignore_index=True), watermarks
+
+def train_model_on_stores(include_archive=False):
+    """Train a fresh model on the sales of every store shard."""
+    print("Loading sales from all stores...")
+    df_with_features, watermarks = load_all_stores_training_frame(include_archive)
+    if df_with_features is None:
+        print("Error: No store databases found")
+        return False
+    return fit_and_save(df_with_features, watermarks=watermarks)
+
+def train_partitioned_model(db_path='inventory.db', workers=None):
+    """Train one model per product Category in parallel, from a snapshot of db_path."""
+    import model_partitions
+    
+    info = db_snapshot.create_snapshot(db_path)
+    print(f"Training on {db_snapshot.describe(info)}")
+    conn = sqlite3.connect(info['path'])
+    try:
+        df_with_features = DemandMatrix.from_db(conn).training_frame()
+        categories = dict(conn.execute('SELECT ProductID, Category FROM Products'))
+    finally:
+        conn.close()
+        db_snapshot.remove_snapshot(info['path'])
+    
+    if df_with_features.empty:
+        print("Error: No sales to train on")
+        return False
+    
+    start_time = datetime.now()
+    index = model_partitions.train_partitions(df_with_features, categories, FEATURE_COLUMNS, workers=workers)
+    partitions = index['partitions'].values()
+    for partition in partitions:
+        print(f"  {partition['name']}: {partition['rows']} samples, MAE={partition['test_mae']:.2f} units ({partition['seconds']:.1f}s)")
+    
+    test_rows = sum(partition['test_rows'] for partition in partitions)
+    test_mae = sum(partition['test_mae'] * partition['test_rows'] for partition in partitions) / test_rows
+    seconds = (datetime.now() - start_time).total_seconds()
+    print(f"✓ {len(index['partitions'])} partition models in {model_partitions.PARTITIONS_DIR}/ "
+          f"({seconds:.1f}s, overall MAE={test_mae:.2f} units)")
+    record_training_run(db_path, model_partitions.PARTITIONS_DIR, info['max_sale_id'], len(df_with_features) - test_rows, test_mae)
+    return True
+
+def save_model(model, path='inventory_model.pkl'):
+    """Write the model next to its destination and swap it in atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+
+def get_training_watermark(conn, model_path='inventory_model.pkl'):
+    """Return the highest SaleID a training run of model_path has processed (0 if none).
+
+    Rejected retrains count too: their sales were evaluated and are left to
+    the next full training rather than re-read every night.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS TrainingRuns (
+            RunID INTEGER PRIMARY KEY AUTOINCREMENT,
+            TrainedAt DATETIME,
+            LastSaleID INTEGER,
+            RowsUsed INTEGER,
+            HoldoutMAE REAL,
+            PreviousMAE REAL,
+            Accepted INTEGER,
+            ModelPath TEXT
+        )
+    ''')
+    if 'ModelPath' not in [row[1] for row in conn.execute('PRAGMA table_info(TrainingRuns)')]:
+        # Runs logged before ModelPath existed were all of the single model
+        conn.execute('ALTER TABLE TrainingRuns ADD COLUMN ModelPath TEXT')
+        conn.execute("UPDATE TrainingRuns SET ModelPath = 'inventory_model.pkl'")
+    row = conn.execute('SELECT MAX(LastSaleID) FROM TrainingRuns WHERE ModelPath = ?', (model_path,)).fetchone()
+    return row[0] or 0
+
+def record_training_run(db_path, model_path, last_sale_id, rows_used, holdout_mae, previous_mae=None, accepted=True):
+    """Log a training run of model_path in the live database; last_sale_id becomes its watermark."""
+    conn = sqlite3.connect(db_path)
+    get_training_watermark(conn, model_path)
+    conn.execute(
+        'INSERT INTO TrainingRuns (TrainedAt, LastSaleID, RowsUsed, HoldoutMAE, PreviousMAE, Accepted, ModelPath) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (datetime.now(), last_sale_id, rows_used, holdout_mae, previous_mae, int(accepted), model_path)
+    )
+    conn.commit()
+    conn.close()
+
+def load_new_sales(conn, watermark, context_days=30):
+    """Build a demand matrix covering sales after the watermark plus context_days before them.
+
+    Returns the matrix, the first date touched by a new sale and the new sale count.
+    """
+    row = conn.execute('SELECT MIN(SaleDay), COUNT(*) FROM Sales WHERE SaleID > ?', (watermark,)).fetchone()
+    first_new_day, new_count = row
+    if first_new_day is None:
+        return None, None, 0
+    
+    matrix = DemandMatrix.from_db(conn, 'WHERE SaleDay >= ?', (first_new_day - context_days,))
+    return matrix, pd.Timestamp(day_keys.from_day(first_new_day)), new_count
+
+def retrain_from_database(db_path='inventory.db', model_path='inventory_model.pkl',
+                          new_estimators=20, holdout_size=0.25, min_rows=50, tolerance=0.02):
+    """Warm-start the saved model on sales recorded since its last training run.
+
+    Every product-day from the earliest new sale onward is a new sample. The
+    newest holdout_size of those days is kept back for validation, and the
+    watermark stops short of the holdout's sales so they are trained on next run.
+    Sales are read from a snapshot, so writes landing mid-run cannot skew the
+    watermark; only the TrainingRuns row is written to the live database.
+    """
+    if not os.path.exists(model_path):
+        print(f"Error: {model_path} not found. Train a base model first.")
+        return False
+    
+    with open(model_path, 'rb') as f:
+        current_model = pickle.load(f)
+    
+    info = db_snapshot.create_snapshot(db_path)
+    print(f"Training on {db_snapshot.describe(info)}")
+    conn = sqlite3.connect(info['path'])
+    try:
+        watermark = get_training_watermark(conn, model_path)
+        matrix, first_new_date, new_count = load_new_sales(conn, watermark)
+        if new_count < min_rows:
+            print(f"Only {new_count} new sales since SaleID {watermark}; skipping retrain")
+            return True
+        return _retrain_on_snapshot(conn, db_path, model_path, current_model, watermark, matrix,
+                                    first_new_date, new_estimators, holdout_size, tolerance)
+    finally:
+        conn.close()
+        db_snapshot.remove_snapshot(info['path'])
+
+def _retrain_on_snapshot(conn, db_path, model_path, current_model, watermark, matrix, first_new_date,
+                         new_estimators, holdout_size, tolerance):
+    
+    df_with_features = matrix.training_frame()
+    new_rows = df_with_features[df_with_features['SaleDate'] >= first_new_date]
+    
+    new_days = np.sort(new_rows['SaleDate'].unique())
+    if len(new_days) < 2:
+        print(f"New sales since SaleID {watermark} cover only {len(new_days)} day(s); need 2 to hold one out. Skipping retrain")
+        return True
+    split = min(max(int(len(new_days) * (1 - holdout_size)), 1), len(new_days) - 1)
+    cutoff = new_days[split]
+    train_df = new_rows[new_rows['SaleDate'] < cutoff]
+    holdout_df = new_rows[new_rows['SaleDate'] >= cutoff]
+    if train_df.empty or holdout_df.empty:
+        print(f"Empty train or holdout slice ({len(train_df)}/{len(holdout_df)} rows); skipping retrain")
+        return True
+    
+    X_train = train_df[FEATURE_COLUMNS]
+    y_train = train_df['QuantitySold']
+    X_holdout = holdout_df[FEATURE_COLUMNS]
+    y_holdout = holdout_df['QuantitySold']
+    
+    if hasattr(current_model, 'warm_start'):
+        model = copy.deepcopy(current_model)
+        model.set_params(warm_start=True, n_estimators=current_model.n_estimators + new_estimators)
+        print(f"Warm-starting {new_estimators} new trees on {len(X_train)} new samples...")
+    else:
+        model = GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=42)
+        print(f"Model does not support warm start; fitting a new model on {len(X_train)} samples...")
+    model.fit(X_train, y_train)
+    
+    previous_mae = mean_absolute_error(y_holdout, current_model.predict(X_holdout))
+    holdout_mae = mean_absolute_error(y_holdout, model.predict(X_holdout))
+    accepted = holdout_mae <= previous_mae * (1 + tolerance)
+    
+    print(f"Holdout MAE: previous={previous_mae:.3f}, retrained={holdout_mae:.3f} units")
+    
+    if accepted:
+        save_model(model, model_path)
+        print(f"✓ Model swapped in ({model.n_estimators} trees)")
+    else:
+        print("✗ Retrained model is worse on the holdout; keeping the current model")
+    
+    # Everything below the first new sale dated in the holdout has been processed,
+    # accepted or not; the holdout's sales are trained on next run
+    last_trained_id = conn.execute(
+        'SELECT COALESCE(MIN(SaleID), (SELECT MAX(SaleID) FROM Sales) + 1) - 1 FROM Sales WHERE SaleID > ? AND SaleDay >= ?',
+        (watermark, day_keys.to_day(pd.Timestamp(cutoff)))
+    ).fetchone()[0]
+    record_training_run(db_path, model_path, last_trained_id, len(train_df), holdout_mae, previous_mae, accepted)
+    
+    return True
+
 if __name__ == '__main__':
     import sys
     
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == '--retrain':
+        # Incremental retrain from the live database
+        success = retrain_from_database()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--partitioned':
+        # One model per Category, trained in parallel worker processes
+        workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else None
+        success = train_partitioned_model(workers=workers)
+    elif len(sys.argv) > 1 and sys.argv[1] == '--all-stores':
+        # Full retrain across inventory.db and every store shard
+        success = train_model_on_stores(include_archive='--archive' in sys.argv)
+    elif len(sys.argv) > 1:
         # Use provided CSV path
         csv_path = sys.argv[1]
         if not os.path.exists(csv_path):
@@ -0,0 +1,117 @@
+import time
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+class WriteQueue:
+    """Single writer thread that applies mutations in group-committed batches.
+
+    Callers submit a function taking a cursor; the writer collects up to
+    max_batch of them (or whatever arrives within max_wait_ms of the first),
+    runs each inside its own SAVEPOINT so one failure does not undo the others,
+    commits once, and only then resolves each caller's Future.
+    """
+
+    def __init__(self, db_path='inventory.db', max_batch=100, max_wait_ms=5):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'items': 0,
+            'failed_items': 0,
+            'max_batch_size': 0,
+            'last_batch_size': 0,
+            'last_commit_ms': 0.0,
+            'total_commit_ms': 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args):
+        """Queue operation(cursor, *args); returns a Future with its result"""
+        future = Future()
+        self._queue.put((operation, args, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['avg_batch_size'] = stats['items'] / stats['batches'] if stats['batches'] else 0.0
+        stats['avg_commit_ms'] = stats['total_commit_ms'] / stats['batches'] if stats['batches'] else 0.0
+        del stats['total_commit_ms']
+        return stats
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _apply(self, conn, batch):
+        start_time = time.perf_counter()
+        cursor = conn.cursor()
+        outcomes = []
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            for operation, args, future in batch:
+                cursor.execute('SAVEPOINT op')
+                try:
+                    outcomes.append((future, operation(cursor, *args), None))
+                    cursor.execute('RELEASE op')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO op')
+                    cursor.execute('RELEASE op')
+                    outcomes.append((future, None, e))
+            cursor.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        commit_ms = (time.perf_counter() - start_time) * 1000
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['items'] += len(batch)
+            self._stats['failed_items'] += sum(1 for _, _, error in outcomes if error is not None)
+            self._stats['max_batch_size'] = max(self._stats['max_batch_size'], len(batch))
+            self._stats['last_batch_size'] = len(batch)
+            self._stats['last_commit_ms'] = commit_ms
+            self._stats['total_commit_ms'] += commit_ms
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._apply(conn, self._collect(first))
+        conn.close()